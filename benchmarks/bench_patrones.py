@@ -0,0 +1,286 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.generador import ALFABETO, generar_flujo, generar_patrones
+from config.patrones_auxilio import PatronesAuxilio
+from kmp.detector_multipatron import DetectorMultiPatron
+from kmp.detector_patron import DetectorPatron
+from kmp.monitor_patrones import MonitorPatrones
+from vision.procesador_eventos import ProcesadorEventos
+
+DIRECTORIO_RESULTADOS = os.path.join("benchmarks", "resultados")
+
+# Cada motor recibe {nombre: patron} y devuelve paso(simbolo) -> número de detecciones
+
+def motor_kmp_reescaneo(patrones):
+    """Ruta original: un DetectorPatron.detectar_patron por patrón sobre toda la secuencia"""
+    detectores = [DetectorPatron(patron) for patron in patrones.values()]
+    max_caracteres = ProcesadorEventos().max_caracteres
+    secuencia = ""
+    ultimo_indice = -1
+
+    def paso(simbolo):
+        nonlocal secuencia, ultimo_indice
+        secuencia = (secuencia + simbolo)[-max_caracteres:]
+        detecciones = 0
+        for detector in detectores:
+            resultado = detector.detectar_patron(secuencia, ultimo_indice)
+            if resultado["detectado"] and resultado["nuevo"]:
+                ultimo_indice = resultado["indice"]
+                detecciones += 1
+        if detecciones:
+            secuencia = ""
+            ultimo_indice = -1
+        return detecciones
+
+    return paso
+
+def motor_kmp_feed_lps(patrones):
+    """Un DetectorPatron en flujo por patrón, siguiendo enlaces LPS"""
+    detectores = [DetectorPatron(patron) for patron in patrones.values()]
+
+    def paso(simbolo):
+        return sum(detector.feed(simbolo) for detector in detectores)
+
+    return paso
+
+def motor_kmp_feed_dfa(patrones):
+    """Un DetectorPatron en flujo por patrón, con tabla de transiciones compilada"""
+    detectores = [DetectorPatron(patron, modo="dfa", alfabeto=ALFABETO) for patron in patrones.values()]
+
+    def paso(simbolo):
+        return sum(detector.feed(simbolo) for detector in detectores)
+
+    return paso
+
+def motor_aho_corasick(patrones):
+    """Un solo autómata Aho-Corasick para todos los patrones"""
+    automata = DetectorMultiPatron(patrones)
+
+    def paso(simbolo):
+        return len(automata.feed(simbolo))
+
+    return paso
+
+def motor_procesar_gesto(patrones):
+    """Ruta en vivo MonitorPatrones.procesar_gesto: confirmación en ProcesadorEventos + autómata + limpieza"""
+    reales = PatronesAuxilio().patrones_auxilio
+    config = PatronesAuxilio()
+    config.patrones_auxilio = {
+        nombre: reales.get(nombre, {
+            "patron": patron,
+            "descripcion": nombre,
+            "urgencia": "ALTA",
+            "accion": "ninguna"
+        })
+        for nombre, patron in patrones.items()
+    }
+
+    procesador_eventos = ProcesadorEventos()
+    monitor = MonitorPatrones(config, procesador_eventos)
+    tiempo = 0.0
+
+    def paso(simbolo):
+        # Frames del mismo gesto, con tiempo del video simulado, hasta que se confirma una vez:
+        # un gesto nuevo necesita frames_para_confirmar frames, uno repetido solo el intervalo
+        nonlocal tiempo
+        while True:
+            tiempo += procesador_eventos.tiempo_repeticion
+            letra_confirmada, patrones_detectados = monitor.procesar_gesto(simbolo, tiempo)
+            if letra_confirmada:
+                return len(patrones_detectados)
+
+    return paso
+
+MOTORES = {
+    "kmp_reescaneo": motor_kmp_reescaneo,
+    "kmp_feed_lps": motor_kmp_feed_lps,
+    "kmp_feed_dfa": motor_kmp_feed_dfa,
+    "aho_corasick": motor_aho_corasick,
+    "procesar_gesto": motor_procesar_gesto,
+    "multiflujo": None,  # se mide aparte: un paso procesa un lote de flujos
+}
+
+def percentil(ordenados, q):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not ordenados:
+        return 0.0
+    indice = min(len(ordenados) - 1, max(0, int(round(q / 100 * len(ordenados))) - 1))
+    return ordenados[indice]
+
+def medir(crear_paso, pasos, simbolos_por_paso, repeticiones):
+    """Medir throughput, latencia por llamada y memoria pico de un motor"""
+    # Throughput: bucle sin instrumentar, mediana de las repeticiones
+    tiempos = []
+    for _ in range(repeticiones):
+        paso = crear_paso()
+        inicio = time.perf_counter()
+        for entrada in pasos:
+            paso(entrada)
+        tiempos.append(time.perf_counter() - inicio)
+    tiempo = statistics.median(tiempos)
+
+    # Latencia por llamada
+    paso = crear_paso()
+    latencias = []
+    detecciones = 0
+    reloj = time.perf_counter_ns
+    for entrada in pasos:
+        t0 = reloj()
+        detecciones += paso(entrada)
+        latencias.append(reloj() - t0)
+    latencias.sort()
+
+    # Memoria pico (construcción + recorrido)
+    tracemalloc.start()
+    paso = crear_paso()
+    for entrada in pasos:
+        paso(entrada)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_simbolos = len(pasos) * simbolos_por_paso
+    return {
+        "simbolos_por_segundo": total_simbolos / tiempo if tiempo > 0 else None,
+        "tiempo_s": tiempo,
+        "latencia_us": {
+            "p50": percentil(latencias, 50) / 1000,
+            "p95": percentil(latencias, 95) / 1000,
+            "p99": percentil(latencias, 99) / 1000,
+            "max": latencias[-1] / 1000 if latencias else 0.0
+        },
+        "memoria_pico_kb": pico / 1024,
+        "detecciones": detecciones
+    }
+
+def medir_multiflujo(patrones, flujo, n_flujos, repeticiones):
+    """DetectorMultiFlujo: n_flujos desfasados del mismo flujo, un lote por paso"""
+    import numpy as np
+    from kmp.detector_multiflujo import DetectorMultiFlujo
+
+    codigos = np.frombuffer(flujo.encode("ascii"), dtype=np.uint8)
+    desfases = (np.arange(n_flujos) * 7) % len(codigos)
+    lotes = [codigos[(desfases + i) % len(codigos)] for i in range(len(codigos))]
+
+    def crear_paso():
+        detector = DetectorMultiFlujo(patrones, n_flujos, alfabeto=ALFABETO)
+
+        def paso(lote):
+            return sum(len(indices) for indices in detector.feed(lote).values())
+
+        return paso
+
+    return medir(crear_paso, lotes, n_flujos, repeticiones)
+
+def version_codigo():
+    """Commit actual de git, si está disponible"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def ejecutar(args):
+    resultados = []
+    omitidos = set()
+
+    for longitud in args.longitudes:
+        for num_patrones in args.num_patrones:
+            patrones = generar_patrones(num_patrones, semilla=args.semilla)
+            for densidad in args.densidades:
+                flujo = generar_flujo(longitud, patrones, densidad, semilla=args.semilla)
+
+                for nombre_motor in args.motores:
+                    caso = {
+                        "motor": nombre_motor,
+                        "longitud": longitud,
+                        "num_patrones": num_patrones,
+                        "densidad": densidad
+                    }
+
+                    # La ruta original es cuadrática: se limita por presupuesto de comparaciones
+                    costo = longitud * num_patrones * min(longitud, ProcesadorEventos().max_caracteres)
+                    if nombre_motor == "kmp_reescaneo" and costo > args.presupuesto_reescaneo:
+                        continue
+
+                    try:
+                        if nombre_motor == "multiflujo":
+                            medicion = medir_multiflujo(patrones, flujo, args.flujos, args.repeticiones)
+                            caso["flujos"] = args.flujos
+                        else:
+                            crear_motor = MOTORES[nombre_motor]
+                            medicion = medir(lambda: crear_motor(patrones), flujo, 1, args.repeticiones)
+                    except ImportError as e:
+                        if nombre_motor not in omitidos:
+                            print(f"Omitiendo {nombre_motor}: {e}", file=sys.stderr)
+                            omitidos.add(nombre_motor)
+                        continue
+
+                    caso.update(medicion)
+                    resultados.append(caso)
+                    print(
+                        f"{nombre_motor:28s} L={longitud:<7d} P={num_patrones:<5d} d={densidad:<5} "
+                        f"{caso['simbolos_por_segundo']:>14,.0f} simb/s  "
+                        f"p50={caso['latencia_us']['p50']:.2f}us p99={caso['latencia_us']['p99']:.2f}us  "
+                        f"mem={caso['memoria_pico_kb']:.0f}KB"
+                    )
+
+    return {
+        "meta": {
+            "suite": "bench_patrones",
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "version": version_codigo(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "parametros": {
+                "longitudes": args.longitudes,
+                "num_patrones": args.num_patrones,
+                "densidades": args.densidades,
+                "repeticiones": args.repeticiones,
+                "semilla": args.semilla,
+                "flujos": args.flujos
+            },
+            "omitidos": sorted(omitidos)
+        },
+        "resultados": resultados
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los motores de detección de patrones")
+    parser.add_argument("--longitudes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--num-patrones", type=int, nargs="+", default=[5, 50, 200])
+    parser.add_argument("--densidades", type=float, nargs="+", default=[0.0, 0.05])
+    parser.add_argument("--motores", nargs="+", choices=list(MOTORES), default=list(MOTORES))
+    parser.add_argument("--flujos", type=int, default=1000, help="flujos simultáneos para multiflujo")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--presupuesto-reescaneo", type=float, default=2e7,
+                        help="máximo de comparaciones estimadas para kmp_reescaneo")
+    parser.add_argument("--salida", help="archivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    informe = ejecutar(args)
+
+    salida = args.salida
+    if not salida:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        salida = os.path.join(
+            DIRECTORIO_RESULTADOS,
+            f"bench_patrones_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {salida}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
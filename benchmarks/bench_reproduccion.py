@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import cv2
+
+from benchmarks.bench_patrones import DIRECTORIO_RESULTADOS, version_codigo
+from config.patrones_auxilio import PatronesAuxilio
+from kmp.monitor_patrones import MonitorPatrones
+from vision.detector_gestos import DetectorGestos
+from vision.fuente_frames import abrir_fuente, es_camara
+from vision.pipeline_video import PipelineVideo
+from vision.procesador_eventos import ProcesadorEventos
+
+RITMOS = ("max", "fuente")
+
+class Reproduccion:
+    def __init__(self, ruta_video, ritmo="max", seguimiento_roi=False):
+        self.ruta_video = ruta_video
+        self.ritmo = ritmo
+
+        # Mismos componentes y la misma ruta que SistemaDeteccionAuxilio, sin ventanas
+        self.patrones_auxilio = PatronesAuxilio()
+        self.detector_gestos = DetectorGestos(seguimiento_roi=seguimiento_roi)
+        self.procesador_eventos = ProcesadorEventos()
+        self.monitor_patrones = MonitorPatrones(self.patrones_auxilio, self.procesador_eventos)
+
+        self.gestos = []
+        self.alertas = []
+
+    def _al_detectar_gesto(self, gesto, tiempo=None):
+        """Igual que SistemaDeteccionAuxilio._al_detectar_gesto, registrando la secuencia"""
+        letra_confirmada, patrones_detectados = self.monitor_patrones.procesar_gesto(gesto, tiempo)
+        if not letra_confirmada:
+            return
+
+        self.detector_gestos.activar_efecto_color()
+        self.gestos.append({"t": round(tiempo, 3), "letra": letra_confirmada})
+        for patron_info in patrones_detectados:
+            self.alertas.append({
+                "t": round(tiempo, 3),
+                "nombre": patron_info["nombre"],
+                "urgencia": patron_info["urgencia"],
+                "posicion": patron_info["posicion"]
+            })
+
+    def _al_renderizar_frame(self, frame_procesado, gesto):
+        # Sin ventana de cámara: el costo del overlay ya quedó medido en la etapa de render
+        pass
+
+    def ejecutar(self):
+        """Procesar el video completo y devolver el informe"""
+        cap = abrir_fuente(self.ruta_video)
+        if not cap.isOpened():
+            raise IOError(f"No se pudo abrir el video: {self.ruta_video}")
+
+        fps_fuente = cap.get(cv2.CAP_PROP_FPS) or 15
+        pipeline = PipelineVideo(
+            cap,
+            self.detector_gestos,
+            self.procesador_eventos,
+            al_gesto=self._al_detectar_gesto,
+            al_frame=self._al_renderizar_frame,
+            reproduccion=True,
+            ritmo_fuente=self.ritmo == "fuente"
+        )
+
+        inicio = time.perf_counter()
+        pipeline.iniciar()
+        try:
+            pipeline.esperar()
+        except KeyboardInterrupt:
+            pipeline.detener()
+        duracion = time.perf_counter() - inicio
+        cap.release()
+
+        etapas = {}
+        for nombre, resumen in pipeline.obtener_estadisticas().items():
+            etapas[nombre] = {
+                "procesados": resumen["procesados"],
+                "descartados": resumen["descartados"],
+                "ms_promedio": round(resumen["ms_promedio"], 3),
+                # fps observado en la reproducción y fps que la etapa sostendría sola
+                "fps": round(resumen["procesados"] / duracion, 2) if duracion > 0 else None,
+                "fps_capacidad": round(1000 / resumen["ms_promedio"], 2) if resumen["ms_promedio"] else None
+            }
+
+        frames = etapas["render"]["procesados"]
+        return {
+            "meta": {
+                "suite": "bench_reproduccion",
+                "fecha": datetime.now().isoformat(timespec="seconds"),
+                "version": version_codigo(),
+                "video": self.ruta_video,
+                "ritmo": self.ritmo,
+                "fps_fuente": fps_fuente
+            },
+            "frames": frames,
+            "duracion_s": round(duracion, 3),
+            "fps": round(frames / duracion, 2) if duracion > 0 else None,
+            "etapas": etapas,
+            "inferencia": self.detector_gestos.obtener_estadisticas_inferencia(),
+            "gestos": self.gestos,
+            "alertas": self.alertas
+        }
+
+def comparar(base, nuevo):
+    """Comparar dos informes del mismo video; devuelve False si cambió la secuencia producida"""
+    print(f"Base: {base['meta'].get('version')}  Nuevo: {nuevo['meta'].get('version')}")
+    for nombre, etapa in nuevo["etapas"].items():
+        etapa_base = base["etapas"].get(nombre, {})
+        if etapa_base.get("fps_capacidad") and etapa.get("fps_capacidad"):
+            ratio = etapa["fps_capacidad"] / etapa_base["fps_capacidad"]
+            print(f"{nombre:12s} {etapa_base['fps_capacidad']:>9.1f} -> {etapa['fps_capacidad']:>9.1f} fps  x{ratio:.2f}")
+
+    iguales = True
+    for clave, campo in (("gestos", "letra"), ("alertas", "nombre")):
+        if [e[campo] for e in base[clave]] != [e[campo] for e in nuevo[clave]]:
+            print(f"La secuencia de {clave} cambió ({len(base[clave])} -> {len(nuevo[clave])})")
+            iguales = False
+    return iguales
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproducir un video grabado por el pipeline completo de detección")
+    parser.add_argument("video", help="archivo de video o directorio de imágenes")
+    parser.add_argument("--ritmo", choices=RITMOS, default="max",
+                        help="max: lo más rápido posible; fuente: al fps del video")
+    parser.add_argument("--salida", help="archivo JSON del informe")
+    parser.add_argument("--comparar", help="informe base para comprobar que la secuencia no cambió")
+    parser.add_argument("--seguimiento-roi", action="store_true",
+                        help="inferir sobre el recorte de la última mano (para compararlo con el frame completo)")
+    args = parser.parse_args(argv)
+
+    if es_camara(args.video):
+        parser.error("la reproducción necesita un video grabado, no una cámara")
+
+    informe = Reproduccion(args.video, args.ritmo, args.seguimiento_roi).ejecutar()
+
+    print(f"{informe['frames']} frames en {informe['duracion_s']} s ({informe['fps']} fps)")
+    for nombre, etapa in informe["etapas"].items():
+        print(f"  {nombre:12s} {etapa['fps_capacidad'] or 0:>9.1f} fps capacidad  {etapa['ms_promedio']:.2f} ms/frame")
+    print(f"Gestos: {''.join(g['letra'] for g in informe['gestos'])}")
+    print(f"Alertas: {', '.join(a['nombre'] for a in informe['alertas']) or '-'}")
+
+    salida = args.salida
+    if not salida:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        salida = os.path.join(
+            DIRECTORIO_RESULTADOS,
+            f"bench_reproduccion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"Informe guardado en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        if not comparar(base, informe):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
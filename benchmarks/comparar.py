@@ -0,0 +1,57 @@
+import argparse
+import json
+import sys
+
+def _clave(caso):
+    return (caso["motor"], caso["longitud"], caso["num_patrones"], caso["densidad"], caso.get("flujos"))
+
+def cargar(ruta):
+    with open(ruta, "r", encoding="utf-8") as f:
+        informe = json.load(f)
+    return informe["meta"], {_clave(caso): caso for caso in informe["resultados"]}
+
+def comparar(base, nuevo, umbral):
+    """Comparar dos informes de bench_patrones y devolver los casos que empeoraron"""
+    regresiones = []
+
+    for clave, caso_nuevo in sorted(nuevo.items(), key=lambda item: str(item[0])):
+        caso_base = base.get(clave)
+        if not caso_base or not caso_base["simbolos_por_segundo"]:
+            continue
+
+        ratio = caso_nuevo["simbolos_por_segundo"] / caso_base["simbolos_por_segundo"]
+        p99_base = caso_base["latencia_us"]["p99"]
+        p99_nuevo = caso_nuevo["latencia_us"]["p99"]
+        motor, longitud, num_patrones, densidad, _ = clave
+
+        marca = ""
+        if ratio < 1 - umbral:
+            marca = "  << REGRESION"
+            regresiones.append(clave)
+
+        print(
+            f"{motor:28s} L={longitud:<7d} P={num_patrones:<5d} d={densidad:<5} "
+            f"throughput x{ratio:.2f}  p99 {p99_base:.2f} -> {p99_nuevo:.2f}us{marca}"
+        )
+
+    return regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparar dos resultados de benchmarks/bench_patrones.py")
+    parser.add_argument("base")
+    parser.add_argument("nuevo")
+    parser.add_argument("--umbral", type=float, default=0.10,
+                        help="caída relativa de throughput considerada regresión")
+    args = parser.parse_args(argv)
+
+    meta_base, base = cargar(args.base)
+    meta_nuevo, nuevo = cargar(args.nuevo)
+    print(f"Base: {meta_base.get('version')}  Nuevo: {meta_nuevo.get('version')}")
+
+    regresiones = comparar(base, nuevo, args.umbral)
+    if regresiones:
+        print(f"{len(regresiones)} caso(s) con regresión mayor al {args.umbral:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,36 @@
+import random
+
+from config.gestos_auxilio import GestosAuxilio
+from config.patrones_auxilio import PatronesAuxilio
+
+ALFABETO = "".join(GestosAuxilio().listar_gestos())  # 'ABCD'
+
+def generar_patrones(num_patrones, semilla=0, longitud_min=3, longitud_max=8):
+    """Patrones reales de PatronesAuxilio completados con patrones sintéticos únicos"""
+    rng = random.Random(semilla)
+    patrones = dict(list(PatronesAuxilio().obtener_cadenas().items())[:num_patrones])
+    usados = set(patrones.values())
+
+    while len(patrones) < num_patrones:
+        longitud = rng.randint(longitud_min, longitud_max)
+        patron = "".join(rng.choice(ALFABETO) for _ in range(longitud))
+        if patron in usados:
+            continue
+        usados.add(patron)
+        patrones[f"sintetico_{len(patrones):04d}"] = patron
+
+    return patrones
+
+def generar_flujo(longitud, patrones, densidad, semilla=0):
+    """Flujo de gestos aleatorio donde cada posición inicia un patrón con probabilidad `densidad`"""
+    rng = random.Random(semilla)
+    cadenas = list(patrones.values())
+    simbolos = []
+
+    while len(simbolos) < longitud:
+        if cadenas and rng.random() < densidad:
+            simbolos.extend(rng.choice(cadenas))
+        else:
+            simbolos.append(rng.choice(ALFABETO))
+
+    return "".join(simbolos[:longitud])
\ No newline at end of file
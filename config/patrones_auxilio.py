@@ -47,4 +47,7 @@ class PatronesAuxilio:
         return self.patrones_auxilio.get(nombre_patron, None)
     
     def listar_patrones(self):
-        return list(self.patrones_auxilio.keys())
\ No newline at end of file
+        return list(self.patrones_auxilio.keys())
+    
+    def obtener_cadenas(self):
+        return {nombre: info["patron"] for nombre, info in self.patrones_auxilio.items()}
\ No newline at end of file
@@ -1,68 +1,232 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext
+from tkinter import ttk
+from datetime import datetime, timedelta
 
 class VentanaAlertas:
-    def __init__(self, sistema):
+    def __init__(self, sistema, filas_visibles=15):
         self.sistema = sistema
+        self.almacen = sistema.almacen_alertas
         self.ventana = tk.Toplevel()
         self.ventana.title("Historial de alertas")
-        self.ventana.geometry("500x400")
+        self.ventana.geometry("700x480")
+        
+        # Vista virtual: solo se consultan y dibujan las filas visibles
+        self.filas_visibles = filas_visibles
+        self.inicio = 0          # desplazamiento de la primera fila visible (0 = la más reciente)
+        self.id_superior = None  # id de la primera fila visible; None = seguir las más recientes
+        self.total = 0           # alertas que cumplen los filtros
+        self.ultimo_id = 0       # cursor para detectar alertas nuevas
+        self.filtros = {}
         
         self._crear_interfaz()
         self.actualizar_alertas()
         self.ventana.protocol("WM_DELETE_WINDOW", self.cerrar)
+        self._seguir_historial()
         
     def _crear_interfaz(self):
         frame_principal = ttk.Frame(self.ventana, padding="20")
         frame_principal.pack(fill=tk.BOTH, expand=True)
         
-        titulo = ttk.Label(frame_principal, 
-                          text="Historial de Alertas", 
+        titulo = ttk.Label(frame_principal,
+                          text="Historial de Alertas",
                           font=("Arial", 16, "bold"))
-        titulo.pack(pady=(0, 20))
-        
-        # Área de texto para alertas
-        self.texto_alertas = scrolledtext.ScrolledText(
-            frame_principal, 
-            wrap=tk.WORD, 
-            width=50, 
-            height=15,
-            font=("Courier", 10)
-        )
-        self.texto_alertas.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        titulo.pack(pady=(0, 10))
+        
+        # Filtros: se aplican en la consulta al almacén
+        frame_filtros = ttk.Frame(frame_principal)
+        frame_filtros.pack(fill=tk.X, pady=(0, 10))
+        
+        urgencias = sorted({info['urgencia'] for info in self.sistema.patrones_auxilio.patrones_auxilio.values()})
+        ttk.Label(frame_filtros, text="Urgencia:").pack(side=tk.LEFT)
+        self.combo_urgencia = ttk.Combobox(frame_filtros, values=["Todas"] + urgencias, state="readonly", width=10)
+        self.combo_urgencia.set("Todas")
+        self.combo_urgencia.pack(side=tk.LEFT, padx=(5, 10))
+        
+        ttk.Label(frame_filtros, text="Desde:").pack(side=tk.LEFT)
+        self.entrada_desde = ttk.Entry(frame_filtros, width=11)
+        self.entrada_desde.pack(side=tk.LEFT, padx=(5, 10))
+        
+        ttk.Label(frame_filtros, text="Hasta:").pack(side=tk.LEFT)
+        self.entrada_hasta = ttk.Entry(frame_filtros, width=11)
+        self.entrada_hasta.pack(side=tk.LEFT, padx=(5, 10))
+        
+        btn_filtrar = ttk.Button(frame_filtros, text="Filtrar", command=self.aplicar_filtros)
+        btn_filtrar.pack(side=tk.LEFT)
+        
+        # Tabla con tantas filas como caben en pantalla y scrollbar controlada a mano
+        frame_tabla = ttk.Frame(frame_principal)
+        frame_tabla.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        columnas = ("numero", "fecha", "urgencia", "descripcion")
+        self.tabla = ttk.Treeview(frame_tabla, columns=columnas, show="headings", height=self.filas_visibles)
+        self.tabla.heading("numero", text="#")
+        self.tabla.heading("fecha", text="Fecha")
+        self.tabla.heading("urgencia", text="Urgencia")
+        self.tabla.heading("descripcion", text="Descripción")
+        self.tabla.column("numero", width=60, anchor=tk.E, stretch=False)
+        self.tabla.column("fecha", width=140, stretch=False)
+        self.tabla.column("urgencia", width=80, stretch=False)
+        self.tabla.column("descripcion", width=300)
+        self.tabla.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.scrollbar = ttk.Scrollbar(frame_tabla, orient=tk.VERTICAL, command=self._desplazar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.tabla.bind("<MouseWheel>", self._rueda)
+        self.tabla.bind("<Button-4>", lambda e: self._mover(-3))
+        self.tabla.bind("<Button-5>", lambda e: self._mover(3))
         
         # Botones de control
         frame_botones = ttk.Frame(frame_principal)
         frame_botones.pack(fill=tk.X)
         
         btn_actualizar = ttk.Button(
-            frame_botones, 
-            text="Actualizar", 
+            frame_botones,
+            text="Actualizar",
             command=self.actualizar_alertas
         )
         btn_actualizar.pack(side=tk.LEFT, padx=(0, 10))
         
         btn_limpiar = ttk.Button(
-            frame_botones, 
-            text="Limpiar Historial", 
+            frame_botones,
+            text="Limpiar Historial",
             command=self.limpiar_historial
         )
         btn_limpiar.pack(side=tk.LEFT)
         
+        self.label_total = ttk.Label(frame_botones, text="", font=("Arial", 9))
+        self.label_total.pack(side=tk.RIGHT)
+        
+    def _leer_fecha(self, entrada):
+        texto = entrada.get().strip()
+        if not texto:
+            return None
+        return datetime.strptime(texto, "%d/%m/%Y")
+        
+    def aplicar_filtros(self):
+        """Construir los filtros de la consulta desde los controles (fechas dd/mm/aaaa)"""
+        try:
+            desde = self._leer_fecha(self.entrada_desde)
+            hasta = self._leer_fecha(self.entrada_hasta)
+        except ValueError:
+            self.label_total.configure(text="Fecha inválida (dd/mm/aaaa)")
+            return
+            
+        urgencia = self.combo_urgencia.get()
+        self.filtros = {
+            "urgencia": None if urgencia == "Todas" else urgencia,
+            "desde": desde.timestamp() if desde else None,
+            # El día "hasta" se incluye completo
+            "hasta": (hasta + timedelta(days=1)).timestamp() if hasta else None
+        }
+        self.inicio = 0
+        self.id_superior = None
+        self.actualizar_alertas()
+        
     def actualizar_alertas(self):
-        alertas = self.sistema.obtener_alertas()
+        """Recontar con los filtros actuales y redibujar solo la ventana visible"""
+        self.ultimo_id = self.almacen.ultimo_id()
+        self.total = self.almacen.contar(**self.filtros)
+        if self.id_superior is not None:
+            # La posición de la fila superior es la cantidad de alertas más nuevas que ella
+            self.inicio = self.almacen.contar(despues_de_id=self.id_superior, **self.filtros)
+        if self.inicio > max(0, self.total - self.filas_visibles):
+            self._ir_a(self.total - self.filas_visibles)
+        self._dibujar()
+        
+    def _seguir_historial(self):
+        """Cada segundo, incorporar solo las alertas nuevas desde el último id visto"""
+        if not self.esta_abierta():
+            return
+            
+        ultimo_id = self.almacen.ultimo_id()
+        if ultimo_id != self.ultimo_id:
+            # Solo se cuentan las filas nuevas (id > último visto), no toda la tabla
+            nuevas = self.almacen.contar(despues_de_id=self.ultimo_id, **self.filtros)
+            if self.id_superior is not None:
+                # Las mismas filas siguen a la vista aunque lleguen alertas más recientes
+                self.inicio += nuevas
+            self.ultimo_id = ultimo_id
+            self.total += nuevas
+            if nuevas:
+                self._dibujar()
+            
+        self.ventana.after(1000, self._seguir_historial)
         
-        self.texto_alertas.delete(1.0, tk.END)
+    def _dibujar(self):
+        # Paginación por clave (id <= fila superior): no depende de cuán abajo se esté
+        antes_de_id = self.id_superior + 1 if self.id_superior is not None else None
+        filas = self.almacen.obtener_pagina(self.filas_visibles, antes_de_id=antes_de_id, **self.filtros)
         
-        if not alertas:
-            self.texto_alertas.insert(tk.END, "No hay alertas registradas.")
+        self.tabla.delete(*self.tabla.get_children())
+        for i, alerta in enumerate(filas):
+            fecha = datetime.fromtimestamp(alerta['timestamp']).strftime("%d/%m/%Y %H:%M:%S")
+            self.tabla.insert("", tk.END, values=(
+                self.total - self.inicio - i,
+                fecha,
+                alerta['urgencia'],
+                alerta['descripcion']
+            ))
+            
+        if self.total:
+            fin = self.inicio + len(filas)
+            self.scrollbar.set(self.inicio / self.total, fin / self.total)
+            self.label_total.configure(text=f"{self.inicio + 1}-{fin} de {self.total} alertas")
         else:
-            for i, alerta in enumerate(alertas, 1):
-                self.texto_alertas.insert(tk.END, f"{i}. {alerta}\n")
-                
+            self.scrollbar.set(0, 1)
+            self.label_total.configure(text="No hay alertas registradas.")
+            
+    def _mover(self, filas):
+        inicio = max(0, min(self.inicio + filas, self.total - self.filas_visibles))
+        if inicio == self.inicio:
+            return
+            
+        paso = inicio - self.inicio
+        if inicio == 0:
+            self.id_superior = None
+        elif paso > 0:
+            # Bajar: la fila que queda `paso` posiciones debajo de la superior actual
+            antes_de_id = self.id_superior + 1 if self.id_superior is not None else None
+            fila = self.almacen.obtener_pagina(1, antes_de_id=antes_de_id, desplazamiento=paso, **self.filtros)
+            if not fila:
+                return
+            self.id_superior = fila[0]['id']
+        else:
+            # Subir: las `-paso` filas más nuevas que la superior actual
+            filas_nuevas = self.almacen.obtener_posteriores(-paso, self.id_superior, **self.filtros)
+            if not filas_nuevas:
+                return
+            self.id_superior = filas_nuevas[-1]['id']
+        self.inicio = inicio
+        self._dibujar()
+        
+    def _ir_a(self, inicio):
+        """Saltar a una posición absoluta (scrollbar); único caso que usa OFFSET"""
+        inicio = max(0, min(inicio, self.total - self.filas_visibles))
+        self.inicio = inicio
+        self.id_superior = None
+        if inicio > 0:
+            fila = self.almacen.obtener_pagina(1, desplazamiento=inicio, **self.filtros)
+            if fila:
+                self.id_superior = fila[0]['id']
+            
+    def _rueda(self, evento):
+        self._mover(-3 if evento.delta > 0 else 3)
+        
+    def _desplazar(self, accion, cantidad, unidad=None):
+        """Comando de la scrollbar: mover por filas, por páginas o saltar a una fracción"""
+        if accion == "moveto":
+            self._ir_a(int(float(cantidad) * self.total))
+            self._dibujar()
+        elif accion == "scroll":
+            paso = self.filas_visibles if unidad == "pages" else 1
+            self._mover(int(cantidad) * paso)
+            
     def limpiar_historial(self):
         try:
-            open("data/alertas_auxilio.txt", "w").close()
+            self.sistema.almacen_alertas.vaciar()
+            self.inicio = 0
+            self.id_superior = None
             self.actualizar_alertas()
         except Exception as e:
             print(f"Error limpiando historial: {e}")
@@ -73,9 +237,10 @@ class VentanaAlertas:
         
     def cerrar(self):
         self.ventana.destroy()
-            
+        
     def esta_abierta(self):
         try:
             return self.ventana.winfo_exists()
         except:
-            return False
\ No newline at end of file
+            return False
+            
\ No newline at end of file
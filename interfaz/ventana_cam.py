@@ -1,10 +1,12 @@
 import cv2
+import time
+import numpy as np
 import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
 
 class VentanaCamara:
-    def __init__(self, cap):
+    def __init__(self, cap, fps_maximo=30):
         self.cap = cap
         self.ventana = tk.Toplevel()
         self.ventana.title("Cámara de seguridad - Reconocimiento de Gestos")
@@ -46,29 +48,62 @@ class VentanaCamara:
         self.ultimo_gesto = ""
         self.contador_frames_sin_gesto = 0
         
+        # Ruta de visualización sin asignaciones por frame: buffers y PhotoImage reutilizados
+        self.max_w, self.max_h = 780, 500
+        self.fps_maximo = fps_maximo
+        self.ultimo_refresco = 0.0
+        self.forma_entrada = None
+        self.buffer_redim = None
+        self.buffer_rgb = None
+        self.imgtk = None
+        self.frames_mostrados = 0
+        self.frames_omitidos = 0
+        
         self.ventana.protocol("WM_DELETE_WINDOW", self.cerrar)
         
+    def _preparar_buffers(self, forma):
+        """Reservar los buffers de destino y el PhotoImage para una resolución de entrada"""
+        h, w = forma[:2]
+        if w > self.max_w or h > self.max_h:
+            ratio = min(self.max_w / w, self.max_h / h)
+            new_w = int(w * ratio)
+            new_h = int(h * ratio)
+            self.buffer_redim = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        else:
+            new_w, new_h = w, h
+            self.buffer_redim = None
+            
+        self.buffer_rgb = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self.imgtk = ImageTk.PhotoImage("RGB", (new_w, new_h))
+        self.label_video.configure(image=self.imgtk)
+        self.label_video.image = self.imgtk
+        self.forma_entrada = forma
+        
+    def _mostrar_imagen(self, frame):
+        """Redimensionar y convertir a RGB dentro de los buffers y refrescar el PhotoImage existente"""
+        if frame.shape != self.forma_entrada:
+            self._preparar_buffers(frame.shape)
+            
+        # Redimensionar antes de convertir: la conversión trabaja sobre menos píxeles
+        origen = frame
+        if self.buffer_redim is not None:
+            h, w = self.buffer_redim.shape[:2]
+            cv2.resize(frame, (w, h), dst=self.buffer_redim)
+            origen = self.buffer_redim
+        cv2.cvtColor(origen, cv2.COLOR_BGR2RGB, dst=self.buffer_rgb)
+        
+        self.imgtk.paste(Image.fromarray(self.buffer_rgb))
+        
     def actualizar_frame(self, frame, gesto_detectado):
         try:
-            # Convertir y redimensionar frame
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w = frame_rgb.shape[:2]
-            max_w, max_h = 780, 500
-            
-            if w > max_w or h > max_h:
-                ratio = min(max_w / w, max_h / h)
-                new_w = int(w * ratio)
-                new_h = int(h * ratio)
-                frame_resized = cv2.resize(frame_rgb, (new_w, new_h))
+            # Limitar el refresco de la imagen con independencia del fps de captura
+            ahora = time.perf_counter()
+            if self.fps_maximo and ahora - self.ultimo_refresco < 1.0 / self.fps_maximo:
+                self.frames_omitidos += 1
             else:
-                frame_resized = frame_rgb
-                
-            # Convertir a ImageTk
-            img = Image.fromarray(frame_resized)
-            imgtk = ImageTk.PhotoImage(image=img)
-            
-            self.label_video.configure(image=imgtk)
-            self.label_video.image = imgtk
+                self.ultimo_refresco = ahora
+                self._mostrar_imagen(frame)
+                self.frames_mostrados += 1
             
             # Actualizar estado del gesto
             if gesto_detectado:
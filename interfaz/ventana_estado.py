@@ -1,15 +1,17 @@
 import tkinter as tk
 from tkinter import ttk
+from utils.instrumentacion import INSTRUMENTACION
 
 class VentanaEstado:
     def __init__(self, sistema):
         self.sistema = sistema
         self.ventana = tk.Toplevel()
         self.ventana.title("Lectura del patrón y estado del sistema - Gestos")
-        self.ventana.geometry("700x500")
+        self.ventana.geometry("700x780")
         
         self._crear_interfaz()
         self.ventana.protocol("WM_DELETE_WINDOW", self.cerrar)
+        self._actualizar_rendimiento()
         
     def _crear_interfaz(self):
         frame_principal = ttk.Frame(self.ventana, padding="20")
@@ -63,6 +65,40 @@ class VentanaEstado:
                                      foreground="green")
         self.label_patron.pack()
         
+        # Rendimiento del pipeline de video
+        frame_rendimiento = ttk.LabelFrame(frame_principal, text="Rendimiento del pipeline", padding="10")
+        frame_rendimiento.pack(fill=tk.X, pady=(0, 10))
+        
+        self.label_rendimiento = ttk.Label(frame_rendimiento,
+                                          text="Sistema detenido",
+                                          font=("Courier", 10),
+                                          justify=tk.LEFT)
+        self.label_rendimiento.pack(anchor=tk.W)
+        
+        # Latencia por etapa (spans de utils/instrumentacion.py)
+        frame_latencia = ttk.LabelFrame(frame_principal, text="Latencia por etapa", padding="10")
+        frame_latencia.pack(fill=tk.X, pady=(0, 10))
+        
+        frame_botones = ttk.Frame(frame_latencia)
+        frame_botones.pack(fill=tk.X, pady=(0, 5))
+        
+        self.btn_instrumentacion = ttk.Button(frame_botones,
+                                              text=self._texto_boton_instrumentacion(),
+                                              command=self.alternar_instrumentacion)
+        self.btn_instrumentacion.pack(side=tk.LEFT, padx=(0, 10))
+        
+        btn_exportar = ttk.Button(frame_botones, text="Exportar JSON", command=self.exportar_instrumentacion)
+        btn_exportar.pack(side=tk.LEFT)
+        
+        self.label_exportado = ttk.Label(frame_botones, text="", font=("Arial", 9))
+        self.label_exportado.pack(side=tk.LEFT, padx=(10, 0))
+        
+        self.label_latencia = ttk.Label(frame_latencia,
+                                        text="",
+                                        font=("Courier", 9),
+                                        justify=tk.LEFT)
+        self.label_latencia.pack(anchor=tk.W)
+        
         # Información del sistema
         frame_info = ttk.LabelFrame(frame_principal, text="Información del Sistema", padding="10")
         frame_info.pack(fill=tk.BOTH, expand=True)
@@ -77,9 +113,9 @@ class VentanaEstado:
         label_info.pack(anchor=tk.W)
         
     def actualizar_estado(self, secuencia, patron_detectado):
-        # Actualizar secuencia
+        # Actualizar secuencia (vista sin copia de los últimos 50 símbolos del buffer)
         if secuencia:
-            secuencia_mostrar = secuencia[-50:] if len(secuencia) > 50 else secuencia
+            secuencia_mostrar = str(secuencia.ultimos(50), "ascii")
             self.label_secuencia.configure(text=secuencia_mostrar)
             self.label_contador.configure(text=f"Longitud: {len(secuencia)} caracteres")
         else:
@@ -98,6 +134,77 @@ class VentanaEstado:
                 foreground="green"
             )
             
+    def _actualizar_rendimiento(self):
+        """Refrescar cada segundo el throughput de cada etapa"""
+        if not self.esta_abierta():
+            return
+            
+        estadisticas = self.sistema.obtener_estadisticas_pipeline()
+        if estadisticas:
+            lineas = [
+                f"{etapa:<11} {datos['fps']:5.1f} fps  {datos['ms_promedio']:6.1f} ms/frame  descartados: {datos['descartados']}"
+                for etapa, datos in estadisticas.items()
+            ]
+            inferencia = estadisticas.get("inferencia", {})
+            if "intervalo" in inferencia:
+                lineas.append(
+                    f"MediaPipe cada {inferencia['intervalo']} frame(s)  "
+                    f"inferencias: {inferencia['inferencias']}  reutilizados: {inferencia['reutilizados']}"
+                )
+                lineas.append(
+                    f"ROI: {inferencia['inferencias_roi']} inferencias recortadas  "
+                    f"re-detecciones completas: {inferencia['redetecciones']}"
+                )
+        else:
+            lineas = ["Sistema detenido"]
+            
+        persistencia = self.sistema.obtener_estadisticas_persistencia()
+        lineas.append(
+            f"Alertas: {persistencia['encoladas']} registradas  {persistencia['escritas']} en disco  "
+            f"pendientes: {persistencia['pendientes']}  retraso: {persistencia['ultimo_retraso_ms']:.0f} ms "
+            f"(máx {persistencia['retraso_maximo_ms']:.0f} ms)"
+        )
+        self.label_rendimiento.configure(text="\n".join(lineas))
+        self._actualizar_latencia()
+            
+        self.ventana.after(1000, self._actualizar_rendimiento)
+            
+    def _actualizar_latencia(self):
+        """Tabla de fps y p50/p95/p99 por span"""
+        resumen = INSTRUMENTACION.resumen()
+        if not resumen:
+            estado = "activa, sin mediciones" if INSTRUMENTACION.activa else "desactivada"
+            self.label_latencia.configure(text=f"Instrumentación {estado}")
+            return
+            
+        lineas = [f"{'etapa':<27}{'fps':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'máx ms':>9}"]
+        for nombre, datos in resumen.items():
+            lineas.append(
+                f"{nombre:<27}{datos['fps']:6.1f}{datos['p50_ms']:9.2f}{datos['p95_ms']:9.2f}"
+                f"{datos['p99_ms']:9.2f}{datos['max_ms']:9.2f}"
+            )
+        self.label_latencia.configure(text="\n".join(lineas))
+        
+    def _texto_boton_instrumentacion(self):
+        return "Desactivar instrumentación" if INSTRUMENTACION.activa else "Activar instrumentación"
+        
+    def alternar_instrumentacion(self):
+        if INSTRUMENTACION.activa:
+            INSTRUMENTACION.desactivar()
+        else:
+            INSTRUMENTACION.reiniciar()
+            INSTRUMENTACION.activar()
+        self.btn_instrumentacion.configure(text=self._texto_boton_instrumentacion())
+        self._actualizar_latencia()
+        
+    def exportar_instrumentacion(self):
+        """Volcar histogramas y estadísticas del pipeline a data/instrumentacion_*.json"""
+        try:
+            ruta = INSTRUMENTACION.exportar_json(extra={"pipeline": self.sistema.obtener_estadisticas_pipeline()})
+            self.label_exportado.configure(text=f"Guardado en {ruta}")
+        except Exception as e:
+            self.label_exportado.configure(text=f"Error exportando: {e}")
+            
     def mostrar(self):
         self.ventana.deiconify()
         self.ventana.lift()
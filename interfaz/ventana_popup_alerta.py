@@ -1,7 +1,5 @@
 import tkinter as tk
 from tkinter import ttk
-import threading
-import time
 
 class VentanaAlertaPopup:
     def __init__(self):
@@ -16,31 +14,84 @@ class VentanaAlertaPopup:
             self.ventana.winfo_screenheight() // 2 - 100
         ))
         
-        # Hacer ventana modal
+        # Hacer ventana modal (un solo grab mientras la ventana exista)
         self.ventana.transient()
         self.ventana.grab_set()
         
         # Texto de alerta principal
         label_alerta = ttk.Label(
-            self.ventana, 
-            text="ALERTA", 
+            self.ventana,
+            text="ALERTA",
             font=("Arial", 32, "bold"),
             foreground="white",
             background="red"
         )
         label_alerta.pack(expand=True)
         
-        # Temporizador para cierre automático
-        self.hilo_temporizador = threading.Thread(target=self._cerrar_automaticamente)
-        self.hilo_temporizador.daemon = True
-        self.hilo_temporizador.start()
+        # Cantidad de alertas agrupadas y últimos patrones
+        self.label_detalle = ttk.Label(
+            self.ventana,
+            text="",
+            font=("Arial", 11, "bold"),
+            foreground="white",
+            background="red",
+            justify=tk.CENTER
+        )
+        self.label_detalle.pack(pady=(0, 20))
+        
+        self.id_cierre = None
         
-    def _cerrar_automaticamente(self):
-        time.sleep(2)  # 2 segundos de visualización
-        self.ventana.after(0, self.cerrar)
+    def actualizar(self, cantidad, nombres):
+        """Mostrar cuántas alertas agrupa la ventana y los últimos patrones"""
+        texto = ", ".join(nombres)
+        if cantidad > 1:
+            texto = f"{cantidad} alertas\n{texto}"
+        self.label_detalle.configure(text=texto)
+        
+    def programar_cierre(self, milisegundos):
+        """Cierre automático con el propio bucle de Tk; cada nueva alerta reinicia el plazo"""
+        if self.id_cierre:
+            self.ventana.after_cancel(self.id_cierre)
+        self.id_cierre = self.ventana.after(milisegundos, self.cerrar)
         
     def cerrar(self):
         try:
             self.ventana.destroy()
         except:
-            pass
\ No newline at end of file
+            pass
+            
+    def esta_abierta(self):
+        try:
+            return self.ventana.winfo_exists()
+        except:
+            return False
+
+class GestorPopups:
+    def __init__(self, duracion_ms=2000, max_nombres=3):
+        # Como máximo una ventana de alerta: las ráfagas se agrupan en ella
+        self.duracion_ms = duracion_ms
+        self.max_nombres = max_nombres
+        self.popup = None
+        self.cantidad = 0
+        self.nombres = []
+        
+    def notificar(self, patron_info):
+        """Mostrar una alerta reutilizando la ventana abierta si la hay"""
+        if not self.popup or not self.popup.esta_abierta():
+            self.popup = VentanaAlertaPopup()
+            self.cantidad = 0
+            self.nombres = []
+            
+        self.cantidad += 1
+        nombre = patron_info['nombre'].replace('_', ' ').upper()
+        if nombre in self.nombres:
+            self.nombres.remove(nombre)
+        self.nombres = (self.nombres + [nombre])[-self.max_nombres:]
+        
+        self.popup.actualizar(self.cantidad, self.nombres)
+        self.popup.programar_cierre(self.duracion_ms)
+        
+    def cerrar(self):
+        if self.popup:
+            self.popup.cerrar()
+            self.popup = None
\ No newline at end of file
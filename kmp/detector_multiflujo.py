@@ -0,0 +1,91 @@
+import numpy as np
+from kmp.detector_multipatron import DetectorMultiPatron
+
+SIN_SIMBOLO = 0  # código que indica que un flujo no recibió gesto en este paso
+
+class DetectorMultiFlujo:
+    def __init__(self, patrones, n_flujos, alfabeto=None):
+        # patrones: {nombre_patron: cadena_patron}, p.ej. PatronesAuxilio().obtener_cadenas()
+        # Mismo autómata Aho-Corasick que usa el sistema, compilado a tablas NumPy
+        self.automata = DetectorMultiPatron(patrones)
+        self.nombres_patrones = list(self.automata.patrones)
+        self.n_flujos = n_flujos
+
+        simbolos = list(alfabeto) if alfabeto else []
+        for patron in self.automata.patrones.values():
+            simbolos += [s for s in sorted(set(patron)) if s not in simbolos]
+        self.alfabeto = simbolos
+
+        self.tabla, self.salidas = self._compilar_tablas()
+        self.tiene_salida = self.salidas.any(axis=1)
+
+        # Código de byte -> columna de la tabla (última columna: fuera del alfabeto)
+        self.columna_codigo = np.full(256, len(simbolos), dtype=np.intp)
+        for k, simbolo in enumerate(simbolos):
+            codigo = ord(simbolo)
+            if codigo < 256:
+                self.columna_codigo[codigo] = k
+
+        # Estado de cada flujo
+        self.estados = np.zeros(n_flujos, dtype=self.tabla.dtype)
+
+    def _compilar_tablas(self):
+        """Convertir el autómata en una tabla densa (estado, símbolo) y una matriz de salidas"""
+        transiciones = self.automata.transiciones
+        n_estados = len(transiciones)
+
+        tabla = np.zeros((n_estados, len(self.alfabeto) + 1), dtype=np.int32)
+        for estado, siguientes in enumerate(transiciones):
+            for k, simbolo in enumerate(self.alfabeto):
+                tabla[estado, k] = siguientes.get(simbolo, 0)
+
+        columna_patron = {nombre: p for p, nombre in enumerate(self.nombres_patrones)}
+        salidas = np.zeros((n_estados, len(self.nombres_patrones)), dtype=bool)
+        for estado, nombres in enumerate(self.automata.salidas):
+            for nombre in nombres:
+                salidas[estado, columna_patron[nombre]] = True
+
+        return tabla, salidas
+
+    def _codigos(self, simbolos):
+        """Normalizar un lote de símbolos (str, bytes o array) a códigos uint8"""
+        if isinstance(simbolos, str):
+            simbolos = simbolos.encode("latin-1", errors="replace")
+        if isinstance(simbolos, (bytes, bytearray, memoryview)):
+            return np.frombuffer(simbolos, dtype=np.uint8)
+        return np.asarray(simbolos, dtype=np.uint8)
+
+    def feed(self, simbolos, flujos=None):
+        """Avanzar todos los flujos en un paso y devolver {nombre_patron: flujos que lo completaron}"""
+        # Sin `flujos`: un símbolo por flujo (SIN_SIMBOLO si no hubo gesto)
+        # Con `flujos`: solo avanzan esos índices, con el símbolo correspondiente
+        codigos = self._codigos(simbolos)
+
+        if flujos is None:
+            flujos = np.flatnonzero(codigos != SIN_SIMBOLO)
+            codigos = codigos[flujos]
+        else:
+            flujos = np.asarray(flujos, dtype=np.intp)
+
+        nuevos = self.tabla[self.estados[flujos], self.columna_codigo[codigos]]
+        self.estados[flujos] = nuevos
+
+        # Solo se revisan las filas de los flujos que llegaron a un estado final
+        finales = np.flatnonzero(self.tiene_salida[nuevos])
+        if finales.size == 0:
+            return {}
+
+        completados = self.salidas[nuevos[finales]]
+        flujos_finales = flujos[finales]
+        detectados = {}
+        for p in np.flatnonzero(completados.any(axis=0)):
+            detectados[self.nombres_patrones[p]] = flujos_finales[completados[:, p]]
+
+        return detectados
+
+    def reiniciar(self, flujos=None):
+        """Volver al estado inicial todos los flujos o solo los indicados"""
+        if flujos is None:
+            self.estados[:] = 0
+        else:
+            self.estados[np.asarray(flujos, dtype=np.intp)] = 0
\ No newline at end of file
@@ -0,0 +1,79 @@
+from collections import deque
+
+class DetectorMultiPatron:
+    def __init__(self, patrones):
+        # patrones: {nombre_patron: cadena_patron}
+        self.patrones = dict(patrones)
+        self.transiciones = [{}]  # goto por estado
+        self.fallo = [0]          # enlace de fallo por estado
+        self.salidas = [()]       # patrones que terminan en cada estado
+        self.estado = 0           # estado actual en modo flujo
+        self._construir_automata()
+
+    def _construir_automata(self):
+        """Construir el automata Aho-Corasick (trie + enlaces de fallo)"""
+        # Trie con todos los patrones
+        for nombre_patron, patron in self.patrones.items():
+            if not patron:
+                continue
+            estado = 0
+            for simbolo in patron:
+                siguiente = self.transiciones[estado].get(simbolo)
+                if siguiente is None:
+                    siguiente = len(self.transiciones)
+                    self.transiciones.append({})
+                    self.fallo.append(0)
+                    self.salidas.append(())
+                    self.transiciones[estado][simbolo] = siguiente
+                estado = siguiente
+            self.salidas[estado] += (nombre_patron,)
+
+        # Enlaces de fallo por recorrido en anchura
+        alfabeto = set()
+        for patron in self.patrones.values():
+            alfabeto.update(patron)
+
+        cola = deque(self.transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            salidas_fallo = self.salidas[self.fallo[estado]]
+            if salidas_fallo:
+                self.salidas[estado] += salidas_fallo
+            for simbolo, siguiente in self.transiciones[estado].items():
+                self.fallo[siguiente] = self._transicion(self.fallo[estado], simbolo) if estado else 0
+                cola.append(siguiente)
+
+        # Reportar en el mismo orden en que se declararon los patrones
+        orden = {nombre_patron: i for i, nombre_patron in enumerate(self.patrones)}
+        self.salidas = [tuple(sorted(salida, key=orden.get)) for salida in self.salidas]
+
+        # Completar transiciones para que cada paso sea una sola consulta
+        cola = deque([0])
+        visitados = {0}
+        while cola:
+            estado = cola.popleft()
+            hijos = list(self.transiciones[estado].values())
+            for simbolo in alfabeto:
+                if simbolo not in self.transiciones[estado]:
+                    self.transiciones[estado][simbolo] = (
+                        self.transiciones[self.fallo[estado]].get(simbolo, 0) if estado else 0
+                    )
+            for hijo in hijos:
+                if hijo not in visitados:
+                    visitados.add(hijo)
+                    cola.append(hijo)
+
+    def _transicion(self, estado, simbolo):
+        """Seguir enlaces de fallo hasta encontrar transicion para el simbolo"""
+        while estado and simbolo not in self.transiciones[estado]:
+            estado = self.fallo[estado]
+        return self.transiciones[estado].get(simbolo, 0)
+
+    def feed(self, simbolo):
+        """Consumir un simbolo y devolver los patrones que terminan en el (O(1) por simbolo)"""
+        self.estado = self.transiciones[self.estado].get(simbolo, 0)
+        return self.salidas[self.estado]
+
+    def reiniciar(self):
+        """Volver al estado inicial del flujo"""
+        self.estado = 0
\ No newline at end of file
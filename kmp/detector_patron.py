@@ -1,8 +1,32 @@
+from array import array
+
+MODOS_DETECCION = ("lps", "dfa")
+
 class DetectorPatron:
-    def __init__(self, patron):
+    def __init__(self, patron, modo="lps", alfabeto=None):
+        if modo not in MODOS_DETECCION:
+            raise ValueError(f"Modo de detección desconocido: {modo}")
+            
         self.patron = patron
+        self.modo = modo
+        self.longitud = len(patron)
         self.lps = self._calcular_lps(patron)
         
+        # Modo compilado: tabla de transiciones (estado, símbolo) sin retrocesos
+        self.tabla = None
+        if modo == "dfa":
+            simbolos = list(alfabeto) if alfabeto else []
+            simbolos += [s for s in sorted(set(patron)) if s not in simbolos]
+            self.indice_simbolo = {simbolo: k for k, simbolo in enumerate(simbolos)}
+            self.ancho = len(simbolos) + 1  # última columna: símbolo fuera del alfabeto
+            self.tabla = self._compilar_tabla()
+        
+        # Estado del modo flujo (feed)
+        self.j = 0
+        self.posicion = 0
+        self.indice_ultima_deteccion = -1
+        self._enlazar_feed()
+        
     def _calcular_lps(self, patron):
         """Calcular el array LPS (Longest Prefix Suffix) para KMP"""
         lps = [0] * len(patron)
@@ -23,6 +47,83 @@ class DetectorPatron:
                     
         return lps
         
+    def _compilar_tabla(self):
+        """Convertir el array LPS en una tabla densa de transiciones del autómata KMP"""
+        M = len(self.patron)
+        ancho = self.ancho
+        tabla = array("H" if M < 0xFFFF else "I", [0] * ((M + 1) * ancho))
+        
+        for estado in range(M + 1):
+            for simbolo, k in self.indice_simbolo.items():
+                if estado < M and self.patron[estado] == simbolo:
+                    siguiente = estado + 1
+                elif estado == 0:
+                    siguiente = 0
+                else:
+                    # Reutilizar la fila del estado de fallo, ya calculada
+                    siguiente = tabla[self.lps[estado - 1] * ancho + k]
+                tabla[estado * ancho + k] = siguiente
+                
+        return tabla
+        
+    def _enlazar_feed(self):
+        """Elegir la implementación de feed una sola vez, en lugar de ramificar en cada símbolo"""
+        if self.longitud == 0:
+            self.feed = lambda simbolo: False
+        elif self.tabla is not None:
+            self.feed = self._crear_feed_dfa()
+            
+    def _crear_feed_dfa(self):
+        """feed compilado: cada estado pasa a ser un dict símbolo -> estado siguiente, así un
+        símbolo cuesta una sola consulta; j y posicion se actualizan igual que en modo lps"""
+        M = self.longitud
+        ancho = self.ancho
+        transiciones = [
+            {simbolo: self.tabla[estado * ancho + k] for simbolo, k in self.indice_simbolo.items()}
+            for estado in range(M)
+        ]
+        # Tras una detección se continúa desde el borde más largo, como hace feed
+        reinicio = self.lps[M - 1]
+        
+        def feed(simbolo):
+            self.posicion += 1
+            # Los símbolos fuera del alfabeto siempre vuelven al estado 0
+            j = transiciones[self.j].get(simbolo, 0)
+            if j == M:
+                self.indice_ultima_deteccion = self.posicion - M
+                self.j = reinicio
+                return True
+            self.j = j
+            return False
+            
+        return feed
+        
+    def feed(self, simbolo):
+        """Consumir un solo símbolo manteniendo el estado KMP entre llamadas"""
+        M = self.longitud
+        self.posicion += 1
+        j = self.j
+        
+        while j > 0 and self.patron[j] != simbolo:
+            j = self.lps[j - 1]
+        if self.patron[j] == simbolo:
+            j += 1
+            
+        if j == M:
+            self.indice_ultima_deteccion = self.posicion - M
+            self.j = self.lps[j - 1]
+            return True
+            
+        self.j = j
+        return False
+        
+    def reiniciar(self):
+        """Reiniciar el estado del modo flujo"""
+        self.j = 0
+        self.posicion = 0
+        self.indice_ultima_deteccion = -1
+        self._enlazar_feed()
+        
     def detectar_patron(self, texto, ultimo_indice_detectado):
         """Buscar patrón en texto usando algoritmo KMP"""
         M = len(self.patron)
@@ -31,6 +132,9 @@ class DetectorPatron:
         if M == 0 or N < M:
             return {"detectado": False, "nuevo": False, "indice": -1}
             
+        if self.tabla is not None:
+            return self._detectar_patron_dfa(texto, ultimo_indice_detectado)
+            
         i = 0  # índice para texto
         j = 0  # índice para patrón
         
@@ -55,4 +159,26 @@ class DetectorPatron:
                 else:
                     i += 1
                     
+        return {"detectado": False, "nuevo": False, "indice": -1}
+        
+    def _detectar_patron_dfa(self, texto, ultimo_indice_detectado):
+        """Misma búsqueda que detectar_patron con una consulta a la tabla por símbolo"""
+        M = len(self.patron)
+        tabla = self.tabla
+        ancho = self.ancho
+        indice_simbolo = self.indice_simbolo
+        otro = ancho - 1
+        estado = 0
+        
+        for i, simbolo in enumerate(texto):
+            estado = tabla[estado * ancho + indice_simbolo.get(simbolo, otro)]
+            if estado == M:
+                indice_inicio = i + 1 - M
+                if indice_inicio > ultimo_indice_detectado:
+                    return {
+                        "detectado": True, 
+                        "nuevo": True, 
+                        "indice": indice_inicio
+                    }
+                    
         return {"detectado": False, "nuevo": False, "indice": -1}
\ No newline at end of file
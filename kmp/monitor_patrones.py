@@ -0,0 +1,55 @@
+from kmp.detector_multipatron import DetectorMultiPatron
+from utils.instrumentacion import INSTRUMENTACION
+
+class MonitorPatrones:
+    def __init__(self, patrones_auxilio, procesador_eventos=None):
+        self.patrones_auxilio = patrones_auxilio
+        self.procesador_eventos = procesador_eventos
+        self.detector_multipatron = self._inicializar_detector_multipatron()
+
+    def _inicializar_detector_multipatron(self):
+        """Construir una sola vez el automata Aho-Corasick con todos los patrones"""
+        try:
+            return DetectorMultiPatron(self.patrones_auxilio.obtener_cadenas())
+        except Exception:
+            return DetectorMultiPatron({})
+
+    def verificar(self, letra, total_simbolos):
+        """Avanzar el automata con la nueva letra y devolver la info de cada patrón completado"""
+        patrones_detectados = []
+
+        for nombre_patron in self.detector_multipatron.feed(letra):
+            info_patron = self.patrones_auxilio.patrones_auxilio[nombre_patron]
+            patrones_detectados.append({
+                'nombre': nombre_patron,
+                'patron': info_patron['patron'],
+                'descripcion': info_patron['descripcion'],
+                'urgencia': info_patron['urgencia'],
+                'accion': info_patron['accion'],
+                # Posición absoluta en la secuencia, válida aunque el buffer dé la vuelta
+                'posicion': total_simbolos - len(info_patron['patron'])
+            })
+
+        return patrones_detectados
+
+    def procesar_gesto(self, gesto, tiempo_actual=None):
+        """Confirmar el gesto en ProcesadorEventos y verificar patrones; devuelve (letra, patrones)"""
+        span = INSTRUMENTACION.inicio()
+        letra_confirmada = self.procesador_eventos.agregar_letra(gesto, tiempo_actual)
+        INSTRUMENTACION.fin("4_gesto.confirmacion", span)
+        if not letra_confirmada:
+            return None, []
+
+        span = INSTRUMENTACION.inicio()
+        patrones_detectados = self.verificar(letra_confirmada, self.procesador_eventos.secuencia.total)
+        INSTRUMENTACION.fin("4_gesto.patrones", span)
+        if patrones_detectados:
+            # Limpiar secuencia después de detectar patrón
+            self.procesador_eventos.limpiar_secuencia()
+            self.reiniciar()
+
+        return letra_confirmada, patrones_detectados
+
+    def reiniciar(self):
+        """Volver al estado inicial tras una alerta"""
+        self.detector_multipatron.reiniciar()
\ No newline at end of file
@@ -1,10 +1,9 @@
 import tkinter as tk
 from tkinter import ttk
 import cv2
-import threading
-import time
 from datetime import datetime
-import os
+from queue import Queue, Empty
+import threading
 import sys
 
 # Configurar encoding para Windows
@@ -15,19 +14,28 @@ if sys.platform == "win32":
 from interfaz.ventana_cam import VentanaCamara
 from interfaz.ventana_estado import VentanaEstado
 from interfaz.ventana_alertas import VentanaAlertas
-from interfaz.ventana_popup_alerta import VentanaAlertaPopup
+from interfaz.ventana_popup_alerta import GestorPopups
 from vision.detector_gestos import DetectorGestos
 from vision.procesador_eventos import ProcesadorEventos
-from kmp.detector_patron import DetectorPatron
+from vision.pipeline_video import PipelineVideo
+from vision.fuente_frames import abrir_fuente
+from kmp.monitor_patrones import MonitorPatrones
 from utils.reloj import Reloj
+from utils.buzon_frame import BuzonUltimoFrame
+from utils.almacen_alertas import AlmacenAlertas, formatear_alerta
+from utils.escritor_alertas import EscritorAlertas
+from utils.archivo_alertas import ArchivoAlertas
+from utils.instrumentacion import INSTRUMENTACION
+from utils.perfilador import PerfiladorMuestreo
+from utils.metricas_prometheus import ServidorMetricas, familias_instrumentacion, muestras_histograma, puerto_desde_entorno
 from config.gestos_auxilio import GestosAuxilio
 from config.patrones_auxilio import PatronesAuxilio
 
 class SistemaDeteccionAuxilio:
-    def __init__(self):
+    def __init__(self, puerto_metricas=None):
         self.root = tk.Tk()
         self.root.title("Sistema de Detección de Auxilio por Gestos")
-        self.root.geometry("350x320")
+        self.root.geometry("350x360")
         
         # Sistema de configuración
         self.gestos_auxilio = GestosAuxilio()
@@ -37,35 +45,89 @@ class SistemaDeteccionAuxilio:
         self.detector_gestos = DetectorGestos()
         self.procesador_eventos = ProcesadorEventos()
         self.reloj = Reloj()
-        self.detectores_patron = self._inicializar_detectores_patron()
+        self.monitor_patrones = MonitorPatrones(self.patrones_auxilio, self.procesador_eventos)
         self.alerta_sonora = self._inicializar_sonido()
         
         # Estado del sistema
-        self.secuencia = ""
         self.ultimo_gesto = ""
-        self.alertas = []
-        self.ultimo_indice_detectado = -1
+        self.gestos_confirmados = 0
+        self.alertas_por_patron = {}  # (patron, urgencia) -> cantidad
+        self.almacen_alertas = self._inicializar_almacen()
+        # Escritura en lotes desde un hilo propio: el disco nunca bloquea a Tk
+        self.escritor_alertas = EscritorAlertas(self.almacen_alertas, intervalo_flush=0.5, fsync="normal")
+        self.escritor_alertas.iniciar()
+        # Alertas antiguas o que exceden el tamaño pasan a segmentos gzip en data/archivo
+        self.archivo_alertas = ArchivoAlertas(self.almacen_alertas, "data/archivo", max_filas=50000, max_dias=90)
+        self.intervalo_rotacion_ms = 60 * 60 * 1000  # una instancia de larga duración rota cada hora
+        self.hilo_rotacion = None
         
         # Control de ventanas y cámara
         self.ventana_camara = None
         self.ventana_estado = None
         self.ventana_alertas = None
+        self.gestor_popups = GestorPopups(duracion_ms=2000)
         self.cap = None
+        self.pipeline = None
         self.ejecutando = False
         
-        self._crear_interfaz_principal()
-    
-    def _inicializar_detectores_patron(self):
-        """Inicializar detectores KMP para todos los patrones"""
-        detectores = {}
+        # Comunicación hilos de video -> Tk
+        self.buzon_frames = BuzonUltimoFrame()  # solo el frame más reciente
+        self.cola_eventos = Queue()             # gestos confirmados, sin pérdida
+        self.intervalo_pantalla_ms = 1000 // 30
+        self.id_sondeo = None
+        
+        # Endpoint Prometheus opcional (solo localhost), servido desde su propio hilo
+        self.servidor_metricas = None
+        if puerto_metricas is not None:
+            self._iniciar_metricas(puerto_metricas)
+        
+        # Perfilado bajo demanda (botón, F9 o kill -USR1): apagado no corre nada
+        self.perfilador = PerfiladorMuestreo("data", duracion=10.0)
         try:
-            patrones = self.patrones_auxilio.patrones_auxilio
-            for nombre_patron, info in patrones.items():
-                detector = DetectorPatron(info["patron"])
-                detectores[nombre_patron] = detector
+            self.perfilador.instalar_senal()
         except Exception:
             pass
-        return detectores
+        
+        self._crear_interfaz_principal()
+        self._programar_rotacion()
+        # bind_all: F9 funciona también con el foco en la ventana de cámara o de estado
+        self.root.bind_all("<F9>", lambda evento: self.perfilar())
+    
+    def _inicializar_almacen(self):
+        """Abrir el historial SQLite e importar una sola vez el antiguo log de texto"""
+        almacen = AlmacenAlertas("data/alertas.db")
+        try:
+            nombres = {info['descripcion']: nombre
+                       for nombre, info in self.patrones_auxilio.patrones_auxilio.items()}
+            almacen.importar_texto("data/alertas_auxilio.txt", nombres)
+        except Exception as e:
+            print(f"Error importando alertas antiguas: {e}")
+        return almacen
+        
+    def _programar_rotacion(self):
+        """Rotar al iniciar y después cada intervalo_rotacion_ms, siempre fuera del hilo de Tk"""
+        if self.hilo_rotacion is None or not self.hilo_rotacion.is_alive():
+            self.hilo_rotacion = threading.Thread(target=self._rotar_historial, daemon=True)
+            self.hilo_rotacion.start()
+        self.root.after(self.intervalo_rotacion_ms, self._programar_rotacion)
+        
+    def _rotar_historial(self):
+        """Archivar las alertas que exceden los límites de tamaño o antigüedad"""
+        try:
+            archivadas = self.archivo_alertas.rotar()
+            if archivadas:
+                print(f"{archivadas} alertas archivadas en data/archivo")
+        except Exception as e:
+            print(f"Error rotando historial de alertas: {e}")
+        
+    def _iniciar_metricas(self, puerto):
+        try:
+            self.servidor_metricas = ServidorMetricas(self.obtener_metricas, puerto)
+            puerto = self.servidor_metricas.iniciar()
+            print(f"Métricas en http://127.0.0.1:{puerto}/metrics")
+        except Exception as e:
+            self.servidor_metricas = None
+            print(f"Error iniciando el endpoint de métricas: {e}")
         
     def _inicializar_sonido(self):
         """Inicializar sistema de sonido con manejo de errores"""
@@ -74,7 +136,8 @@ class SistemaDeteccionAuxilio:
             return AlertaSonora()
         except ImportError:
             class SonidoDummy:
-                def sonar_alerta(self): pass
+                def sonar_alerta(self, urgencia=None): pass
+                def detener(self): pass
                 def silenciar(self): pass
                 def activar(self): pass
                 activado = True
@@ -136,6 +199,11 @@ class SistemaDeteccionAuxilio:
         )
         self.label_estado_sonido.pack(side=tk.LEFT)
         
+        self.btn_perfilar = ttk.Button(frame_principal, 
+                                      text="Perfilar 10 s (F9)", 
+                                      command=self.perfilar)
+        self.btn_perfilar.grid(row=6, column=0, columnspan=2, pady=5, sticky="ew")
+        
         # Configuración de grid
         frame_principal.columnconfigure(0, weight=1)
         frame_principal.columnconfigure(1, weight=1)
@@ -151,6 +219,19 @@ class SistemaDeteccionAuxilio:
             self.btn_sonido.config(text="🔊 Silenciar Alertas")
             self.label_estado_sonido.config(text="Sonido: ACTIVADO", foreground="green")
         
+    def perfilar(self):
+        """Muestrear las pilas de todos los hilos durante la ventana fija y guardar en data/"""
+        if not self.perfilador.iniciar():
+            return
+        self.btn_perfilar.config(text="Perfilando...", state=tk.DISABLED)
+        self.root.after(int(self.perfilador.duracion * 1000) + 500, self._fin_perfilado)
+        
+    def _fin_perfilado(self):
+        if self.perfilador.esta_activo():
+            self.root.after(200, self._fin_perfilado)
+            return
+        self.btn_perfilar.config(text="Perfilar 10 s (F9)", state=tk.NORMAL)
+        
     def iniciar_sistema(self):
         """Iniciar sistema de captura y procesamiento"""
         if self.ejecutando:
@@ -159,27 +240,40 @@ class SistemaDeteccionAuxilio:
         if self.ventana_camara and not self.ventana_camara.esta_abierta():
             self.ventana_camara = None
             
-        self.cap = cv2.VideoCapture(0)
+        # Cámara configurada a 640x480 y 15 fps
+        self.cap = abrir_fuente(0, ancho=640, alto=480, fps=15)
         if not self.cap.isOpened():
             return
             
-        # Configurar cámara
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FPS, 15)
-            
         self.ejecutando = True
         
         # Iniciar ventana y procesamiento
         self.ventana_camara = VentanaCamara(self.cap)
-        self.hilo_procesamiento = threading.Thread(target=self._procesar_video)
-        self.hilo_procesamiento.daemon = True
-        self.hilo_procesamiento.start()
+        self.pipeline = PipelineVideo(
+            self.cap,
+            self.detector_gestos,
+            self.procesador_eventos,
+            al_gesto=self._al_detectar_gesto,
+            al_frame=self._al_renderizar_frame
+        )
+        self.pipeline.iniciar()
+        self.id_sondeo = self.root.after(self.intervalo_pantalla_ms, self._sondear_en_main_thread)
         
     def detener_sistema(self):
         """Detener sistema de forma segura"""
         self.ejecutando = False
-        time.sleep(0.5)
+        
+        if self.pipeline:
+            self.pipeline.detener()
+            
+        # Atender los últimos gestos confirmados antes de detener el sondeo
+        if self.id_sondeo:
+            self.root.after_cancel(self.id_sondeo)
+            self.id_sondeo = None
+            self._sondear_en_main_thread()
+            
+        # Las alertas de la sesión quedan en disco antes de liberar la cámara
+        self.escritor_alertas.flush()
         
         if self.cap:
             self.cap.release()
@@ -213,95 +307,133 @@ class SistemaDeteccionAuxilio:
         self.ventana_alertas.actualizar_alertas()
         self.ventana_alertas.mostrar()
     
-    def _procesar_video(self):
-        """Procesar video en hilo separado"""
-        try:
-            while self.ejecutando and self.cap.isOpened():
-                ret, frame = self.cap.read()
-                if not ret:
-                    break
-                    
-                frame = cv2.flip(frame, 1)
-                
-                gesto_confirmado = self.procesador_eventos.gesto_esta_confirmado()
-                frame_procesado, gesto = self.detector_gestos.process_frame(frame, gesto_confirmado)
-                
-                if gesto:
-                    secuencia_anterior = self.secuencia
-                    self.root.after(0, self._procesar_gesto_en_main_thread, gesto, secuencia_anterior, frame_procesado)
-                else:
-                    if self.ventana_camara and self.ventana_camara.esta_abierta():
-                        self.root.after(0, self._actualizar_camara_en_main_thread, frame_procesado, gesto)
-                
-                time.sleep(0.05)
-                        
-        except Exception:
-            pass
-        finally:
-            if self.cap:
-                self.cap.release()
-
-    def _procesar_gesto_en_main_thread(self, gesto, secuencia_anterior, frame_procesado):
-        """Procesar gesto detectado en el hilo principal"""
-        try:
-            patrones_detectados = []  
+    def _al_detectar_gesto(self, gesto, tiempo=None):
+        """Confirmar gesto y verificar patrones en el hilo de inferencia, sin depender de Tk"""
+        letra_confirmada, patrones_detectados = self.monitor_patrones.procesar_gesto(gesto, tiempo)
+        if not letra_confirmada:
+            return
             
-            nueva_secuencia = self.procesador_eventos.agregar_letra(gesto, self.secuencia)
+        self.gestos_confirmados += 1
+        self.detector_gestos.activar_efecto_color()
+        self.cola_eventos.put(patrones_detectados)
+        
+    def _al_renderizar_frame(self, frame_procesado, gesto):
+        """Dejar el frame dibujado en el buzón; Tk lo toma a su propio ritmo"""
+        self.buzon_frames.publicar((frame_procesado, gesto, INSTRUMENTACION.inicio()))
+        
+    def _sondear_en_main_thread(self):
+        """Atender todos los eventos de gestos y mostrar solo el frame más reciente"""
+        while True:
+            try:
+                patrones_detectados = self.cola_eventos.get_nowait()
+            except Empty:
+                break
+            span = INSTRUMENTACION.inicio()
+            self._procesar_gesto_en_main_thread(patrones_detectados)
+            INSTRUMENTACION.fin("5_tk.alertas", span)
             
-            if nueva_secuencia != self.secuencia:
-                self.secuencia = nueva_secuencia
-                self.detector_gestos.activar_efecto_color()
-                
-                patrones_detectados = self._verificar_patrones_auxilio()
-                
-                if patrones_detectados:
-                    self._limpiar_secuencia_despues_alerta()
-                    for patron_info in patrones_detectados:
-                        self._activar_alerta_especifica(patron_info)
+        # El hilo de render solo dibuja el overlay si hay una ventana que lo muestre
+        if self.pipeline:
+            self.pipeline.anotar = bool(self.ventana_camara and self.ventana_camara.esta_abierta())
             
-            # Actualizar interfaces
-            if self.ventana_camara and self.ventana_camara.esta_abierta():
-                self.ventana_camara.actualizar_frame(frame_procesado, gesto)
-                
+        elemento = self.buzon_frames.tomar()
+        if elemento:
+            frame_procesado, gesto, publicado = elemento
+            # Tiempo que el frame esperó en el buzón hasta que Tk lo tomó
+            INSTRUMENTACION.fin("5_tk.entrega", publicado)
+            span = INSTRUMENTACION.inicio()
+            self._actualizar_camara_en_main_thread(frame_procesado, gesto)
+            INSTRUMENTACION.fin("5_tk.pantalla", span)
+            
+        if self.ejecutando:
+            self.id_sondeo = self.root.after(self.intervalo_pantalla_ms, self._sondear_en_main_thread)
+            
+    def obtener_estadisticas_persistencia(self):
+        """Alertas encoladas, escritas y retraso del escritor en segundo plano"""
+        return self.escritor_alertas.obtener_estadisticas()
+        
+    def obtener_estadisticas_pipeline(self):
+        """Throughput por etapa del pipeline de video"""
+        if not self.pipeline:
+            return {}
+        estadisticas = self.pipeline.obtener_estadisticas()
+        estadisticas["render"]["descartados"] += self.buzon_frames.sobrescritos
+        estadisticas["inferencia"].update(self.detector_gestos.obtener_estadisticas_inferencia())
+        return estadisticas
+        
+    def obtener_metricas(self):
+        """Familias de métricas para Prometheus; se llama desde el hilo del endpoint
+        y solo lee contadores, sin tomar los locks del pipeline ni del buzón"""
+        pipeline = self.pipeline
+        familias = [
+            ("gestos_sistema_activo", "gauge", "1 mientras la captura está en marcha",
+             [("", {}, 1 if self.ejecutando else 0)]),
+            ("gestos_confirmados_total", "counter", "Gestos confirmados por ProcesadorEventos",
+             [("", {}, self.gestos_confirmados)]),
+            ("gestos_alertas_total", "counter", "Alertas activadas por patrón y urgencia",
+             [("", {"patron": patron, "urgencia": urgencia}, cantidad)
+              for (patron, urgencia), cantidad in sorted(dict(self.alertas_por_patron).items())]),
+            ("gestos_inferencias_total", "counter", "Frames con inferencia de MediaPipe o con landmarks reutilizados",
+             [("", {"tipo": "mediapipe"}, self.detector_gestos.inferencias_realizadas),
+              ("", {"tipo": "reutilizada"}, self.detector_gestos.frames_reutilizados)]),
+            ("gestos_alertas_persistidas_total", "counter", "Alertas encoladas y escritas en disco",
+             [("", {"estado": "encolada"}, self.escritor_alertas.encoladas),
+              ("", {"estado": "escrita"}, self.escritor_alertas.escritas)])
+        ]
+        
+        profundidad = [
+            ("", {"cola": "eventos"}, len(self.cola_eventos.queue)),
+            ("", {"cola": "alertas_disco"}, self.escritor_alertas.encoladas - self.escritor_alertas.escritas)
+        ]
+        if pipeline:
+            profundidad += [
+                ("", {"cola": "inferencia"}, len(pipeline.cola_inferencia)),
+                ("", {"cola": "render"}, len(pipeline.cola_render))
+            ]
+            familias += [
+                ("gestos_frames_total", "counter", "Frames procesados por etapa del pipeline",
+                 [("", {"etapa": nombre}, etapa.procesados) for nombre, etapa in pipeline.estadisticas.items()]),
+                ("gestos_frames_descartados_total", "counter", "Frames descartados por cola llena o sobrescritos en el buzón",
+                 [("", {"cola": "inferencia"}, pipeline.cola_inferencia.descartados),
+                  ("", {"cola": "render"}, pipeline.cola_render.descartados),
+                  ("", {"cola": "pantalla"}, self.buzon_frames.sobrescritos)]),
+                ("gestos_etapa_segundos", "histogram", "Tiempo de proceso de cada frame por etapa",
+                 [muestra for nombre, etapa in pipeline.estadisticas.items()
+                  for muestra in muestras_histograma(etapa.histograma, {"etapa": nombre})])
+            ]
+        familias.append(("gestos_cola_profundidad", "gauge", "Elementos en espera en cada cola", profundidad))
+        return familias + familias_instrumentacion(INSTRUMENTACION)
+
+    def _procesar_gesto_en_main_thread(self, patrones_detectados):
+        """Activar alertas y actualizar interfaces por un gesto confirmado"""
+        try:
+            for patron_info in patrones_detectados:
+                self._activar_alerta_especifica(patron_info)
+            
+            # Actualizar interfaces (el frame llega por el buzón)
             if self.ventana_estado and self.ventana_estado.esta_abierta():
-                self.ventana_estado.actualizar_estado(self.secuencia, bool(patrones_detectados))
+                self.ventana_estado.actualizar_estado(self.procesador_eventos.secuencia, bool(patrones_detectados))
                 
         except Exception:
             pass
 
-    def _limpiar_secuencia_despues_alerta(self):
-        """Limpiar secuencia después de detectar patrón"""
-        self.secuencia = ""
-        self.ultimo_indice_detectado = -1
-
-    def _verificar_patrones_auxilio(self):
-        """Verificar todos los patrones de auxilio en la secuencia"""
-        patrones_detectados = []
-        
-        for nombre_patron, detector in self.detectores_patron.items():
-            info_patron = self.patrones_auxilio.patrones_auxilio[nombre_patron]
-            resultado = detector.detectar_patron(self.secuencia, self.ultimo_indice_detectado)
-            
-            if resultado["detectado"] and resultado["nuevo"]:
-                self.ultimo_indice_detectado = resultado["indice"]
-                patrones_detectados.append({
-                    'nombre': nombre_patron,
-                    'patron': info_patron['patron'],
-                    'descripcion': info_patron['descripcion'],
-                    'urgencia': info_patron['urgencia'],
-                    'accion': info_patron['accion']
-                })
-        
-        return patrones_detectados
-
     def _activar_alerta_especifica(self, patron_info):
         """Activar alerta específica según el patrón detectado"""
-        self.alerta_sonora.sonar_alerta()
-        VentanaAlertaPopup()
+        clave = (patron_info['nombre'], patron_info['urgencia'])
+        self.alertas_por_patron[clave] = self.alertas_por_patron.get(clave, 0) + 1
+        # Primero se persiste: un fallo de sonido o de ventanas (p. ej. con la raíz ya
+        # destruida en el vaciado final de detener_sistema) no debe perder la alerta
         self._guardar_alerta_auxilio(patron_info)
         
-        if self.ventana_alertas and self.ventana_alertas.esta_abierta():
-            self.ventana_alertas.actualizar_alertas()
+        try:
+            self.alerta_sonora.sonar_alerta(patron_info['urgencia'])
+        except Exception as e:
+            print(f"Error reproduciendo alerta sonora: {e}")
+            
+        try:
+            self.gestor_popups.notificar(patron_info)
+        except Exception as e:
+            print(f"Error mostrando alerta emergente: {e}")
 
     def _actualizar_camara_en_main_thread(self, frame_procesado, gesto):
         """Actualizar cámara en hilo principal"""
@@ -312,29 +444,35 @@ class SistemaDeteccionAuxilio:
             pass
 
     def _guardar_alerta_auxilio(self, patron_info):
-        """Guardar alerta en archivo de registro"""
-        timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        alerta = f"AUXILIO [{patron_info['urgencia']}] - {patron_info['descripcion']} - {timestamp}"
-        
-        os.makedirs("data", exist_ok=True)
-        with open("data/alertas_auxilio.txt", "a", encoding="utf-8") as f:
-            f.write(f"{alerta}\n")
-        
-        self.alertas.append(alerta)
+        """Guardar alerta en el historial"""
+        timestamp = datetime.now().timestamp()
+        self.escritor_alertas.encolar(patron_info, timestamp)
             
-    def obtener_alertas(self):
-        """Obtener historial de alertas"""
-        try:
-            with open("data/alertas_auxilio.txt", "r", encoding="utf-8") as f:
-                return [line.strip() for line in f.readlines() if line.strip()]
-        except FileNotFoundError:
-            return []
+    def obtener_alertas(self, desde=None, hasta=None, urgencia=None):
+        """Recorrer el historial completo en orden cronológico: segmentos archivados y luego la base activa"""
+        escritas = self.escritor_alertas.flush()
+        for alerta in self.archivo_alertas.leer(desde=desde, hasta=hasta, urgencia=urgencia):
+            yield formatear_alerta(alerta)
+        if escritas:
+            return
+        # Si el disco no respondió a tiempo, lo que sigue en la cola también forma parte del historial
+        for patron_info, timestamp in self.escritor_alertas.pendientes():
+            if ((desde is None or timestamp >= desde) and (hasta is None or timestamp < hasta)
+                    and (not urgencia or patron_info.get("urgencia") == urgencia)):
+                yield formatear_alerta(dict(patron_info, timestamp=timestamp))
             
     def ejecutar(self):
         """Ejecutar aplicación principal"""
         self.root.mainloop()
         self.detener_sistema()
+        self.escritor_alertas.detener()
+        self.almacen_alertas.cerrar()
+        self.alerta_sonora.detener()
+        self.perfilador.detener()
+        if self.servidor_metricas:
+            self.servidor_metricas.detener()
 
 if __name__ == "__main__":
-    app = SistemaDeteccionAuxilio()
+    # METRICAS_PUERTO=9464 expone /metrics en localhost
+    app = SistemaDeteccionAuxilio(puerto_metricas=puerto_desde_entorno())
     app.ejecutar()
\ No newline at end of file
@@ -0,0 +1,229 @@
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+import cv2
+
+# Configurar encoding para Windows
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+
+from vision.detector_gestos import DetectorGestos
+from vision.procesador_eventos import ProcesadorEventos
+from vision.fuente_frames import abrir_fuente, es_camara
+from vision.cache_landmarks import GrabadorLandmarks
+from utils.instrumentacion import INSTRUMENTACION, Histograma
+from utils.perfilador import PerfiladorMuestreo
+from utils.metricas_prometheus import ServidorMetricas, familias_instrumentacion, muestras_histograma
+from kmp.monitor_patrones import MonitorPatrones
+from config.patrones_auxilio import PatronesAuxilio
+
+# Modo servidor sin interfaz: no importa tkinter ni PIL
+
+class SistemaHeadless:
+    def __init__(self, fuente, salida=None, eventos_frame=True, voltear=True,
+                 max_frames=None, fps_inferencia_objetivo=None, grabar_landmarks=None):
+        self.fuente = fuente
+        self.salida = salida or sys.stdout
+        self.eventos_frame = eventos_frame
+        self.voltear = voltear
+        self.max_frames = max_frames
+
+        # Mismos componentes que SistemaDeteccionAuxilio
+        self.patrones_auxilio = PatronesAuxilio()
+        self.detector_gestos = DetectorGestos(fps_inferencia_objetivo=fps_inferencia_objetivo)
+        self.procesador_eventos = ProcesadorEventos()
+        self.monitor_patrones = MonitorPatrones(self.patrones_auxilio, self.procesador_eventos)
+
+        # Landmarks por frame para re-ejecutar gestos y patrones sin MediaPipe
+        self.grabador = GrabadorLandmarks(grabar_landmarks) if grabar_landmarks else None
+
+        self.frames = 0
+        self.gestos_confirmados = 0
+        self.alertas = 0
+        self.alertas_por_patron = {}  # (patron, urgencia) -> cantidad
+        self.histograma_inferencia = Histograma("inferencia")
+        self.ejecutando = False
+
+    def _emitir(self, evento):
+        """Escribir un evento como una línea JSON"""
+        self.salida.write(json.dumps(evento, ensure_ascii=False) + "\n")
+        self.salida.flush()
+
+    def procesar_frame(self, frame, indice, tiempo):
+        """Gesto -> confirmación -> patrones para un frame; devuelve las alertas generadas"""
+        if self.voltear:
+            frame = cv2.flip(frame, 1)
+
+        inicio = time.perf_counter_ns()
+        manos, gesto = self.detector_gestos.detectar(frame)
+        fin = time.perf_counter_ns()
+        self.histograma_inferencia.registrar(fin - inicio, fin)
+        if INSTRUMENTACION.activa:
+            INSTRUMENTACION.fin("2_inferencia.total", inicio)
+        if self.grabador:
+            self.grabador.agregar(tiempo, manos)
+
+        letra_confirmada = None
+        patrones_detectados = []
+        if gesto:
+            letra_confirmada, patrones_detectados = self.monitor_patrones.procesar_gesto(gesto, tiempo)
+
+        if letra_confirmada:
+            self.gestos_confirmados += 1
+
+        if self.eventos_frame:
+            self._emitir({
+                "tipo": "frame",
+                "frame": indice,
+                "t": round(tiempo, 3),
+                "gesto": gesto,
+                "confirmado": letra_confirmada
+            })
+
+        for patron_info in patrones_detectados:
+            self.alertas += 1
+            clave = (patron_info["nombre"], patron_info["urgencia"])
+            self.alertas_por_patron[clave] = self.alertas_por_patron.get(clave, 0) + 1
+            self._emitir(dict(
+                tipo="alerta",
+                frame=indice,
+                t=round(tiempo, 3),
+                fecha=datetime.now().isoformat(timespec="seconds"),
+                **patron_info
+            ))
+
+        return patrones_detectados
+
+    def ejecutar(self):
+        """Leer la fuente hasta agotarla (o Ctrl+C) emitiendo eventos JSON"""
+        cap = abrir_fuente(self.fuente)
+        if not cap.isOpened():
+            self._emitir({"tipo": "error", "mensaje": f"No se pudo abrir la fuente: {self.fuente}"})
+            return 1
+
+        en_vivo = es_camara(self.fuente)
+        fps_fuente = cap.get(cv2.CAP_PROP_FPS) or 15
+        inicio = time.perf_counter()
+        self.ejecutando = True
+
+        try:
+            while self.ejecutando and cap.isOpened():
+                if self.max_frames is not None and self.frames >= self.max_frames:
+                    break
+
+                span = INSTRUMENTACION.inicio()
+                ret, frame = cap.read()
+                INSTRUMENTACION.fin("1_captura.lectura", span)
+                if not ret:
+                    break
+
+                # En vivo se usa el reloj real; en archivos, el tiempo del propio video
+                tiempo = time.time() if en_vivo else self.frames / fps_fuente
+                self.procesar_frame(frame, self.frames, tiempo)
+                self.frames += 1
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.ejecutando = False
+            cap.release()
+            if self.grabador:
+                self.grabador.guardar()
+
+        duracion = time.perf_counter() - inicio
+        resumen = {
+            "tipo": "resumen",
+            "frames": self.frames,
+            "gestos_confirmados": self.gestos_confirmados,
+            "alertas": self.alertas,
+            "duracion_s": round(duracion, 3),
+            "fps": round(self.frames / duracion, 2) if duracion > 0 else None,
+            "inferencia": self.detector_gestos.obtener_estadisticas_inferencia()
+        }
+        if INSTRUMENTACION.activa:
+            resumen["latencia"] = INSTRUMENTACION.resumen()
+        self._emitir(resumen)
+        return 0
+
+    def detener(self):
+        self.ejecutando = False
+
+    def obtener_metricas(self):
+        """Familias de métricas para Prometheus (solo lectura de contadores, sin locks)"""
+        return [
+            ("gestos_sistema_activo", "gauge", "1 mientras la fuente se está procesando",
+             [("", {}, 1 if self.ejecutando else 0)]),
+            ("gestos_frames_total", "counter", "Frames procesados",
+             [("", {}, self.frames)]),
+            ("gestos_confirmados_total", "counter", "Gestos confirmados por ProcesadorEventos",
+             [("", {}, self.gestos_confirmados)]),
+            ("gestos_alertas_total", "counter", "Alertas activadas por patrón y urgencia",
+             [("", {"patron": patron, "urgencia": urgencia}, cantidad)
+              for (patron, urgencia), cantidad in sorted(dict(self.alertas_por_patron).items())]),
+            ("gestos_inferencias_total", "counter", "Frames con inferencia de MediaPipe o con landmarks reutilizados",
+             [("", {"tipo": "mediapipe"}, self.detector_gestos.inferencias_realizadas),
+              ("", {"tipo": "reutilizada"}, self.detector_gestos.frames_reutilizados)]),
+            ("gestos_etapa_segundos", "histogram", "Tiempo de proceso de cada frame por etapa",
+             muestras_histograma(self.histograma_inferencia, {"etapa": "inferencia"}))
+        ] + familias_instrumentacion(INSTRUMENTACION)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detección de gestos de auxilio sin interfaz gráfica (JSON lines)")
+    parser.add_argument("--fuente", default="0",
+                        help="índice de cámara, archivo de video o directorio de imágenes")
+    parser.add_argument("--salida", help="archivo .jsonl (por defecto stdout)")
+    parser.add_argument("--solo-alertas", action="store_true", help="no emitir un evento por frame")
+    parser.add_argument("--sin-voltear", action="store_true", help="no aplicar el espejo horizontal")
+    parser.add_argument("--max-frames", type=int)
+    parser.add_argument("--fps-inferencia", type=float, help="presupuesto de inferencias por segundo")
+    parser.add_argument("--grabar-landmarks", help="archivo .npz donde guardar los landmarks de cada frame")
+    parser.add_argument("--instrumentar", action="store_true",
+                        help="medir latencia por etapa e incluir p50/p95/p99 en el resumen")
+    parser.add_argument("--exportar-instrumentacion", help="archivo .json donde volcar los histogramas al terminar")
+    parser.add_argument("--metricas-puerto", type=int,
+                        help="exponer métricas Prometheus en http://127.0.0.1:PUERTO/metrics")
+    parser.add_argument("--perfilar", type=float, metavar="SEGUNDOS",
+                        help="perfilar los primeros SEGUNDOS y guardar las pilas en data/ (también con kill -USR1)")
+    args = parser.parse_args(argv)
+
+    # Perfilado bajo demanda: la señal solo arranca la captura, apagado no corre nada
+    perfilador = PerfiladorMuestreo("data", duracion=args.perfilar or 10.0)
+    perfilador.instalar_senal()
+    if args.perfilar:
+        perfilador.iniciar()
+
+    if args.instrumentar or args.exportar_instrumentacion:
+        INSTRUMENTACION.activar()
+
+    salida = open(args.salida, "a", encoding="utf-8") if args.salida else None
+    servidor_metricas = None
+    try:
+        sistema = SistemaHeadless(
+            args.fuente,
+            salida=salida,
+            eventos_frame=not args.solo_alertas,
+            voltear=not args.sin_voltear,
+            max_frames=args.max_frames,
+            fps_inferencia_objetivo=args.fps_inferencia,
+            grabar_landmarks=args.grabar_landmarks
+        )
+        if args.metricas_puerto is not None:
+            servidor_metricas = ServidorMetricas(sistema.obtener_metricas, args.metricas_puerto)
+            puerto = servidor_metricas.iniciar()
+            print(f"Métricas en http://127.0.0.1:{puerto}/metrics", file=sys.stderr)
+        codigo = sistema.ejecutar()
+        if args.exportar_instrumentacion:
+            INSTRUMENTACION.exportar_json(args.exportar_instrumentacion)
+        return codigo
+    finally:
+        perfilador.detener()
+        if servidor_metricas:
+            servidor_metricas.detener()
+        if salida:
+            salida.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
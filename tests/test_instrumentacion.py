@@ -0,0 +1,29 @@
+import random
+
+from utils.instrumentacion import Histograma, LIMITES_NS
+
+def test_percentil_no_supera_el_maximo():
+    histograma = Histograma("prueba")
+    # 8.268 ms cae en un bucket cuyo límite superior es mayor (~9.7 ms)
+    for duracion_ns in (1_000_000, 2_000_000, 8_268_000):
+        histograma.registrar(duracion_ns, duracion_ns)
+
+    maximo_ms = histograma.maximo_ns / 1e6
+    for p in (50, 95, 99, 100):
+        assert histograma.percentil(p) <= maximo_ms
+    assert histograma.resumen()["p99_ms"] <= histograma.resumen()["max_ms"]
+
+def test_percentil_no_supera_el_maximo_con_datos_aleatorios():
+    generador = random.Random(7)
+    for _ in range(50):
+        histograma = Histograma("prueba")
+        for _ in range(generador.randint(1, 200)):
+            duracion_ns = int(generador.lognormvariate(14, 2))
+            histograma.registrar(duracion_ns, duracion_ns)
+        for p in (50, 95, 99):
+            assert histograma.percentil(p) <= histograma.maximo_ns / 1e6
+
+def test_percentil_por_encima_del_ultimo_bucket():
+    histograma = Histograma("prueba")
+    histograma.registrar(LIMITES_NS[-1] * 2, 0)
+    assert histograma.percentil(99) == LIMITES_NS[-1] * 2 / 1e6
\ No newline at end of file
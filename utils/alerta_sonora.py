@@ -1,21 +1,15 @@
+import heapq
+import itertools
 import threading
 import platform
 import time
 
-class AlertaSonora:
-    def __init__(self):
-        self.activado = True
-        
-    def sonar_alerta(self):
-        """Activar sonido de alerta"""
-        if not self.activado:
-            return
-            
-        hilo = threading.Thread(target=self._reproducir_alerta, daemon=True)
-        hilo.start()
-    
-    def _reproducir_alerta(self):
-        """Reproducir sonido de alerta multiplataforma"""
+# Menor número = se reproduce antes
+PRIORIDAD_URGENCIA = {"CRITICA": 0, "ALTA": 1, "MEDIA": 2, "BAJA": 3}
+
+class BackendSistema:
+    """Reproduce el sonido con winsound en Windows o con el beep de la terminal"""
+    def reproducir(self, urgencia):
         try:
             if platform.system() == "Windows":
                 import winsound
@@ -32,9 +26,129 @@ class AlertaSonora:
                     time.sleep(0.5)
         except Exception:
             pass
-    
+
+class BackendGrabacion:
+    """No suena ni espera: registra lo que se habría reproducido (para pruebas)"""
+    def __init__(self):
+        self.reproducidos = []
+        
+    def reproducir(self, urgencia):
+        self.reproducidos.append((time.time(), urgencia))
+
+class AlertaSonora:
+    def __init__(self, backend=None, capacidad=8, ventana_fusion=2.0):
+        self.activado = True
+        self.backend = backend or BackendSistema()
+        self.capacidad = capacidad
+        self.ventana_fusion = ventana_fusion  # segundos en que un mismo sonido no se repite
+        
+        # Un único hilo de reproducción alimentado por una cola de prioridad acotada
+        self._cola = []                 # heap de (prioridad, orden, urgencia)
+        self._orden = itertools.count()
+        self._condicion = threading.Condition()
+        self._ultimo_reproducido = {}   # urgencia -> instante en que empezó a sonar
+        self._reproduciendo = False
+        self._activo = True
+        self.hilo = None
+        
+        self.solicitadas = 0
+        self.reproducidas = 0
+        self.fusionadas = 0
+        self.descartadas = 0
+        
+    def sonar_alerta(self, urgencia="ALTA"):
+        """Activar sonido de alerta"""
+        if not self.activado:
+            return
+            
+        with self._condicion:
+            self.solicitadas += 1
+            ahora = time.monotonic()
+            
+            # Mismo sonido ya en cola o sonando hace poco: se fusiona
+            pendiente = any(u == urgencia for _, _, u in self._cola)
+            reciente = ahora - self._ultimo_reproducido.get(urgencia, float("-inf")) < self.ventana_fusion
+            if pendiente or reciente:
+                self.fusionadas += 1
+                return
+                
+            entrada = (PRIORIDAD_URGENCIA.get(urgencia, len(PRIORIDAD_URGENCIA)), next(self._orden), urgencia)
+            if len(self._cola) >= self.capacidad:
+                # Cola llena: sale la entrada menos urgente (o no entra la nueva)
+                peor = max(self._cola)
+                if entrada > peor:
+                    self.descartadas += 1
+                    return
+                self._cola.remove(peor)
+                heapq.heapify(self._cola)
+                self.descartadas += 1
+                
+            heapq.heappush(self._cola, entrada)
+            self._iniciar_hilo()
+            self._condicion.notify()
+            
+    def _iniciar_hilo(self):
+        if self.hilo is None or not self.hilo.is_alive():
+            self._activo = True
+            self.hilo = threading.Thread(target=self._bucle, daemon=True)
+            self.hilo.start()
+            
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                while not self._cola and self._activo:
+                    self._condicion.wait()
+                if not self._cola:
+                    return
+                _, _, urgencia = heapq.heappop(self._cola)
+                self._ultimo_reproducido[urgencia] = time.monotonic()
+                self._reproduciendo = True
+                
+            self._reproducir_alerta(urgencia)
+            
+            with self._condicion:
+                self._reproduciendo = False
+                self.reproducidas += 1
+                self._condicion.notify_all()
+                
+    def _reproducir_alerta(self, urgencia):
+        """Reproducir sonido de alerta multiplataforma"""
+        try:
+            self.backend.reproducir(urgencia)
+        except Exception:
+            pass
+            
+    def esperar(self, timeout=None):
+        """Esperar a que la cola quede vacía y no haya nada sonando"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._condicion:
+            while self._cola or self._reproduciendo:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._condicion.wait(restante)
+        return True
+        
+    def detener(self):
+        """Terminar el hilo de reproducción después de lo que ya está en cola"""
+        with self._condicion:
+            self._activo = False
+            self._condicion.notify_all()
+            
+    def obtener_estadisticas(self):
+        with self._condicion:
+            return {
+                "solicitadas": self.solicitadas,
+                "reproducidas": self.reproducidas,
+                "fusionadas": self.fusionadas,
+                "descartadas": self.descartadas,
+                "en_cola": len(self._cola)
+            }
+            
     def silenciar(self):
         self.activado = False
-        
+        with self._condicion:
+            self._cola.clear()
+            
     def activar(self):
         self.activado = True
\ No newline at end of file
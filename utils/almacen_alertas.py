@@ -0,0 +1,226 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+FORMATO_FECHA = "%d/%m/%Y %H:%M:%S"
+
+# Formato de las líneas del antiguo data/alertas_auxilio.txt
+LINEA_TEXTO = re.compile(r"^AUXILIO \[(?P<urgencia>[^\]]*)\] - (?P<descripcion>.*) - (?P<fecha>\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2})$")
+
+# Política de fsync -> PRAGMA synchronous (en WAL, NORMAL solo sincroniza en los checkpoints)
+SINCRONIZACION = {
+    "cada_lote": "FULL",
+    "normal": "NORMAL",
+    "nunca": "OFF"
+}
+
+# AUTOINCREMENT: los ids nunca se reutilizan, ni después de vaciar() ni de archivar.
+# nombre_patron es la clave de PatronesAuxilio y patron la cadena de gestos, como en patron_info
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS alertas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    urgencia TEXT,
+    nombre_patron TEXT,
+    patron TEXT,
+    descripcion TEXT,
+    accion TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_alertas_timestamp ON alertas(timestamp);
+CREATE INDEX IF NOT EXISTS idx_alertas_urgencia ON alertas(urgencia, timestamp);
+CREATE INDEX IF NOT EXISTS idx_alertas_nombre_patron ON alertas(nombre_patron, timestamp);
+"""
+
+class AlmacenAlertas:
+    def __init__(self, ruta="data/alertas.db"):
+        self.ruta = ruta
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+        # Una conexión compartida entre hilos, serializada con un lock
+        self._lock = threading.Lock()
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(ESQUEMA)
+
+    def configurar_sincronizacion(self, politica):
+        """Elegir cuándo SQLite hace fsync: 'cada_lote', 'normal' o 'nunca'"""
+        if politica not in SINCRONIZACION:
+            raise ValueError(f"Política de fsync desconocida: {politica}")
+        with self._lock:
+            self.conexion.execute(f"PRAGMA synchronous={SINCRONIZACION[politica]}")
+
+    def _fila(self, patron_info, timestamp=None):
+        return (
+            timestamp if timestamp is not None else time.time(),
+            patron_info.get("urgencia"),
+            patron_info.get("nombre"),
+            patron_info.get("patron"),
+            patron_info.get("descripcion"),
+            patron_info.get("accion")
+        )
+
+    def guardar(self, patron_info, timestamp=None):
+        """Guardar una alerta y devolver su id"""
+        with self._lock, self.conexion:
+            cursor = self.conexion.execute(
+                "INSERT INTO alertas (timestamp, urgencia, nombre_patron, patron, descripcion, accion) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                self._fila(patron_info, timestamp)
+            )
+            return cursor.lastrowid
+
+    def guardar_lote(self, alertas):
+        """Guardar [(patron_info, timestamp)] en una sola transacción"""
+        with self._lock, self.conexion:
+            self.conexion.executemany(
+                "INSERT INTO alertas (timestamp, urgencia, nombre_patron, patron, descripcion, accion) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [self._fila(patron_info, timestamp) for patron_info, timestamp in alertas]
+            )
+
+    def _filtros(self, urgencia=None, nombre_patron=None, desde=None, hasta=None):
+        condiciones = []
+        parametros = []
+        if urgencia:
+            condiciones.append("urgencia = ?")
+            parametros.append(urgencia)
+        if nombre_patron:
+            condiciones.append("nombre_patron = ?")
+            parametros.append(nombre_patron)
+        if desde is not None:
+            condiciones.append("timestamp >= ?")
+            parametros.append(desde)
+        if hasta is not None:
+            condiciones.append("timestamp < ?")
+            parametros.append(hasta)
+        return condiciones, parametros
+
+    def contar(self, urgencia=None, nombre_patron=None, desde=None, hasta=None, despues_de_id=None):
+        """Alertas que cumplen los filtros; con despues_de_id solo las más nuevas que ese id (usa la clave primaria)"""
+        condiciones, parametros = self._filtros(urgencia, nombre_patron, desde, hasta)
+        if despues_de_id is not None:
+            condiciones.append("id > ?")
+            parametros.append(despues_de_id)
+        consulta = "SELECT COUNT(*) FROM alertas"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        with self._lock:
+            return self.conexion.execute(consulta, parametros).fetchone()[0]
+
+    def obtener_pagina(self, limite=100, antes_de_id=None, urgencia=None, nombre_patron=None, desde=None, hasta=None,
+                       desplazamiento=0):
+        """Alertas más recientes primero; paginar pasando el id más bajo de la página anterior o un desplazamiento"""
+        condiciones, parametros = self._filtros(urgencia, nombre_patron, desde, hasta)
+        if antes_de_id is not None:
+            condiciones.append("id < ?")
+            parametros.append(antes_de_id)
+
+        consulta = "SELECT * FROM alertas"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += " ORDER BY id DESC LIMIT ? OFFSET ?"
+        parametros.extend((limite, desplazamiento))
+
+        with self._lock:
+            return [dict(fila) for fila in self.conexion.execute(consulta, parametros)]
+
+    def obtener_posteriores(self, limite, despues_de_id, urgencia=None, nombre_patron=None, desde=None, hasta=None):
+        """Las `limite` alertas siguientes a despues_de_id, de la más vieja a la más nueva (keyset hacia arriba)"""
+        condiciones, parametros = self._filtros(urgencia, nombre_patron, desde, hasta)
+        condiciones.append("id > ?")
+        parametros.append(despues_de_id)
+        consulta = "SELECT * FROM alertas WHERE " + " AND ".join(condiciones) + " ORDER BY id LIMIT ?"
+        parametros.append(limite)
+
+        with self._lock:
+            return [dict(fila) for fila in self.conexion.execute(consulta, parametros)]
+
+    def obtener_rango(self, desde=None, hasta=None, urgencia=None, nombre_patron=None, tam_lote=500, hasta_id=None):
+        """Recorrer en orden cronológico las alertas de un rango de tiempo, por lotes"""
+        ultimo_id = 0
+        while True:
+            condiciones, parametros = self._filtros(urgencia, nombre_patron, desde, hasta)
+            condiciones.append("id > ?")
+            parametros.append(ultimo_id)
+            if hasta_id is not None:
+                condiciones.append("id <= ?")
+                parametros.append(hasta_id)
+            consulta = "SELECT * FROM alertas WHERE " + " AND ".join(condiciones) + " ORDER BY id LIMIT ?"
+            parametros.append(tam_lote)
+
+            with self._lock:
+                filas = [dict(fila) for fila in self.conexion.execute(consulta, parametros)]
+            if not filas:
+                return
+            yield from filas
+            ultimo_id = filas[-1]["id"]
+
+    def ultimo_id(self):
+        with self._lock:
+            return self.conexion.execute("SELECT MAX(id) FROM alertas").fetchone()[0] or 0
+
+    def id_corte(self, antes_de=None, conservar=None):
+        """Mayor id que queda fuera por antigüedad (timestamp < antes_de) o por exceso de filas"""
+        corte = 0
+        with self._lock:
+            if antes_de is not None:
+                fila = self.conexion.execute(
+                    "SELECT MAX(id) FROM alertas WHERE timestamp < ?", (antes_de,)
+                ).fetchone()
+                corte = max(corte, fila[0] or 0)
+            if conservar is not None:
+                fila = self.conexion.execute(
+                    "SELECT id FROM alertas ORDER BY id DESC LIMIT 1 OFFSET ?", (conservar,)
+                ).fetchone()
+                if fila:
+                    corte = max(corte, fila[0])
+        return corte
+
+    def eliminar_hasta(self, id_limite):
+        """Borrar las alertas con id <= id_limite (ya archivadas)"""
+        with self._lock, self.conexion:
+            return self.conexion.execute("DELETE FROM alertas WHERE id <= ?", (id_limite,)).rowcount
+
+    def vaciar(self):
+        with self._lock, self.conexion:
+            self.conexion.execute("DELETE FROM alertas")
+
+    def importar_texto(self, ruta, nombres_por_descripcion=None):
+        """Importar una sola vez un log de texto antiguo; el archivo queda renombrado como .importado"""
+        if not os.path.exists(ruta):
+            return 0
+
+        nombres_por_descripcion = nombres_por_descripcion or {}
+        alertas = []
+        with open(ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                coincidencia = LINEA_TEXTO.match(linea.strip())
+                if not coincidencia:
+                    continue
+                descripcion = coincidencia.group("descripcion")
+                timestamp = datetime.strptime(coincidencia.group("fecha"), FORMATO_FECHA).timestamp()
+                alertas.append(({
+                    "urgencia": coincidencia.group("urgencia"),
+                    "nombre": nombres_por_descripcion.get(descripcion),
+                    "descripcion": descripcion
+                }, timestamp))
+
+        self.guardar_lote(alertas)
+        os.replace(ruta, ruta + ".importado")
+        return len(alertas)
+
+    def cerrar(self):
+        with self._lock:
+            self.conexion.close()
+
+def formatear_alerta(alerta):
+    """Misma línea que escribía el antiguo log de texto"""
+    fecha = datetime.fromtimestamp(alerta["timestamp"]).strftime(FORMATO_FECHA)
+    return f"AUXILIO [{alerta['urgencia']}] - {alerta['descripcion']} - {fecha}"
\ No newline at end of file
@@ -0,0 +1,146 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+class ArchivoAlertas:
+    def __init__(self, almacen, directorio="data/archivo", max_filas=50000, max_dias=90,
+                 filas_por_segmento=10000):
+        self.almacen = almacen
+        self.directorio = directorio
+        self.max_filas = max_filas              # filas que se conservan en la base activa
+        self.max_dias = max_dias                # antigüedad máxima en la base activa
+        self.filas_por_segmento = filas_por_segmento
+        self.ruta_indice = os.path.join(directorio, "indice.json")
+        self._lock = threading.Lock()
+
+    def cargar_indice(self):
+        """Segmentos archivados en orden cronológico: archivo, desde, hasta, filas, primer_id, ultimo_id"""
+        try:
+            with open(self.ruta_indice, "r", encoding="utf-8") as f:
+                indice = json.load(f)
+        except FileNotFoundError:
+            return []
+
+        # Índices escritos por versiones anteriores pueden repetir un archivo: queda la última entrada
+        unicos = {entrada["archivo"]: entrada for entrada in indice}
+        return [entrada for entrada in indice if unicos[entrada["archivo"]] is entrada]
+
+    def _guardar_indice(self, indice):
+        temporal = self.ruta_indice + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(indice, f, indent=2)
+        os.replace(temporal, self.ruta_indice)
+
+    def rotar(self, ahora=None):
+        """Pasar a segmentos gzip las alertas que exceden el tamaño o la antigüedad; devuelve cuántas"""
+        ahora = ahora if ahora is not None else time.time()
+        with self._lock:
+            id_limite = self.almacen.id_corte(
+                antes_de=ahora - self.max_dias * 86400 if self.max_dias else None,
+                conservar=self.max_filas
+            )
+            if not id_limite:
+                return 0
+
+            os.makedirs(self.directorio, exist_ok=True)
+            indice = self.cargar_indice()
+            archivadas = 0
+            segmento = []
+
+            for alerta in self.almacen.obtener_rango(hasta_id=id_limite):
+                segmento.append(alerta)
+                if len(segmento) == self.filas_por_segmento:
+                    indice.append(self._escribir_segmento(segmento))
+                    archivadas += len(segmento)
+                    segmento = []
+            if segmento:
+                indice.append(self._escribir_segmento(segmento))
+                archivadas += len(segmento)
+
+            # Primero el índice, después el borrado: ante un corte nada se pierde
+            self._guardar_indice(indice)
+            self.almacen.eliminar_hasta(id_limite)
+            return archivadas
+
+    def _escribir_segmento(self, alertas):
+        """Escribir un segmento .jsonl.gz de forma atómica y devolver su entrada de índice"""
+        base = f"alertas_{alertas[0]['id']:09d}_{alertas[-1]['id']:09d}"
+        nombre = base + ".jsonl.gz"
+        sufijo = 1
+        # Un segmento archivado nunca se sobrescribe (p. ej. ids de una base recreada)
+        while os.path.exists(os.path.join(self.directorio, nombre)):
+            sufijo += 1
+            nombre = f"{base}_{sufijo}.jsonl.gz"
+        ruta = os.path.join(self.directorio, nombre)
+        temporal = ruta + ".tmp"
+        with gzip.open(temporal, "wt", encoding="utf-8") as f:
+            for alerta in alertas:
+                f.write(json.dumps(alerta, ensure_ascii=False) + "\n")
+        os.replace(temporal, ruta)
+
+        tiempos = [alerta["timestamp"] for alerta in alertas]
+        return {
+            "archivo": nombre,
+            "desde": min(tiempos),
+            "hasta": max(tiempos),
+            "filas": len(alertas),
+            "primer_id": alertas[0]["id"],
+            "ultimo_id": alertas[-1]["id"]
+        }
+
+    def leer(self, desde=None, hasta=None, urgencia=None, incluir_activas=True):
+        """Generador cronológico sobre los segmentos archivados y la base activa, sin cargar todo en memoria"""
+        for entrada in self.cargar_indice():
+            # El índice de rangos evita abrir segmentos fuera del intervalo
+            if desde is not None and entrada["hasta"] < desde:
+                continue
+            if hasta is not None and entrada["desde"] >= hasta:
+                continue
+
+            with gzip.open(os.path.join(self.directorio, entrada["archivo"]), "rt", encoding="utf-8") as f:
+                for linea in f:
+                    alerta = json.loads(linea)
+                    if desde is not None and alerta["timestamp"] < desde:
+                        continue
+                    if hasta is not None and alerta["timestamp"] >= hasta:
+                        continue
+                    if urgencia and alerta["urgencia"] != urgencia:
+                        continue
+                    yield alerta
+
+        if incluir_activas:
+            yield from self.almacen.obtener_rango(desde=desde, hasta=hasta, urgencia=urgencia)
+
+def _fecha(texto):
+    return datetime.strptime(texto, "%d/%m/%Y").timestamp() if texto else None
+
+def main(argv=None):
+    from utils.almacen_alertas import AlmacenAlertas
+
+    parser = argparse.ArgumentParser(description="Rotar el historial de alertas o exportarlo completo como JSON lines")
+    parser.add_argument("accion", choices=["rotar", "exportar"])
+    parser.add_argument("--base", default="data/alertas.db")
+    parser.add_argument("--directorio", default="data/archivo")
+    parser.add_argument("--desde", help="dd/mm/aaaa")
+    parser.add_argument("--hasta", help="dd/mm/aaaa (excluido)")
+    parser.add_argument("--urgencia")
+    args = parser.parse_args(argv)
+
+    almacen = AlmacenAlertas(args.base)
+    archivo = ArchivoAlertas(almacen, args.directorio)
+    try:
+        if args.accion == "rotar":
+            print(f"{archivo.rotar()} alertas archivadas en {args.directorio}")
+        else:
+            for alerta in archivo.leer(_fecha(args.desde), _fecha(args.hasta), args.urgencia):
+                sys.stdout.write(json.dumps(alerta, ensure_ascii=False) + "\n")
+    finally:
+        almacen.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+class BufferCircular:
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        # Cada símbolo se escribe dos veces (i e i + capacidad) para que los
+        # últimos N símbolos siempre formen una ventana contigua sin copiar
+        self._datos = bytearray(2 * capacidad)
+        self.cabeza = 0   # próxima posición de escritura
+        self.total = 0    # símbolos agregados desde el inicio (posición absoluta)
+        self.inicio = 0   # posición absoluta del símbolo más antiguo aún guardado
+
+    def agregar(self, simbolo):
+        """Agregar un símbolo en O(1), descartando el más antiguo si está lleno"""
+        codigo = ord(simbolo)
+        self._datos[self.cabeza] = codigo
+        self._datos[self.cabeza + self.capacidad] = codigo
+
+        self.cabeza += 1
+        if self.cabeza == self.capacidad:
+            self.cabeza = 0
+
+        self.total += 1
+        if self.total - self.inicio > self.capacidad:
+            self.inicio = self.total - self.capacidad
+
+    def ultimos(self, n=None):
+        """Vista (memoryview, sin copia) de los últimos n símbolos"""
+        disponibles = len(self)
+        n = disponibles if n is None else max(0, min(n, disponibles))
+        fin = self.cabeza + self.capacidad
+        return memoryview(self._datos)[fin - n:fin]
+
+    def desde(self, posicion):
+        """Vista de los símbolos a partir de una posición absoluta (si sigue en el buffer)"""
+        return self.ultimos(self.total - max(posicion, self.inicio))
+
+    def contiene(self, posicion):
+        """Verificar si una posición absoluta sigue guardada tras dar la vuelta"""
+        return self.inicio <= posicion < self.total
+
+    def vaciar(self):
+        """Vaciar sin invalidar las posiciones absolutas ya entregadas"""
+        self.inicio = self.total
+
+    def __len__(self):
+        return self.total - self.inicio
+
+    def __str__(self):
+        return str(self.ultimos(), "ascii")
\ No newline at end of file
@@ -0,0 +1,29 @@
+import threading
+
+class BuzonUltimoFrame:
+    def __init__(self):
+        # Un solo espacio: cada publicación reemplaza a la anterior si aún no se tomó
+        self._lock = threading.Lock()
+        self._elemento = None
+        self._nuevo = False
+        self.publicados = 0
+        self.sobrescritos = 0
+
+    def publicar(self, elemento):
+        """Dejar el elemento más reciente (gana el último)"""
+        with self._lock:
+            if self._nuevo:
+                self.sobrescritos += 1
+            self._elemento = elemento
+            self._nuevo = True
+            self.publicados += 1
+
+    def tomar(self):
+        """Tomar el último elemento publicado, o None si no hay uno nuevo"""
+        with self._lock:
+            if not self._nuevo:
+                return None
+            elemento = self._elemento
+            self._elemento = None
+            self._nuevo = False
+            return elemento
\ No newline at end of file
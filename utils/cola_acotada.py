@@ -0,0 +1,83 @@
+import threading
+from collections import deque
+
+class ColaDescartaAntiguos:
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self._elementos = deque(maxlen=capacidad)
+        self._condicion = threading.Condition()
+        self.descartados = 0
+
+    def put(self, elemento):
+        """Encolar sin bloquear; si está llena se descarta el elemento más antiguo"""
+        with self._condicion:
+            if len(self._elementos) == self.capacidad:
+                self.descartados += 1
+            self._elementos.append(elemento)
+            self._condicion.notify()
+
+    def get(self, timeout=None):
+        """Sacar el elemento más antiguo, o None si no llega nada antes del timeout"""
+        with self._condicion:
+            if not self._elementos:
+                self._condicion.wait(timeout)
+            if not self._elementos:
+                return None
+            return self._elementos.popleft()
+
+    def cerrar(self):
+        """Despertar a los consumidores en espera"""
+        with self._condicion:
+            self._condicion.notify_all()
+
+    def vaciar(self):
+        with self._condicion:
+            self._elementos.clear()
+
+    def __len__(self):
+        return len(self._elementos)
+
+class ColaSinPerdidas:
+    def __init__(self, capacidad):
+        # Para reproducciones deterministas: el productor espera en lugar de descartar
+        self.capacidad = capacidad
+        self._elementos = deque()
+        self._condicion = threading.Condition()
+        self.descartados = 0
+        self.cerrada = False
+
+    def put(self, elemento):
+        """Encolar esperando a que haya espacio; devuelve False si la cola se cerró"""
+        with self._condicion:
+            while len(self._elementos) >= self.capacidad and not self.cerrada:
+                self._condicion.wait()
+            if self.cerrada:
+                return False
+            self._elementos.append(elemento)
+            self._condicion.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Sacar el elemento más antiguo, o None si no llega nada antes del timeout"""
+        with self._condicion:
+            if not self._elementos:
+                self._condicion.wait(timeout)
+            if not self._elementos:
+                return None
+            elemento = self._elementos.popleft()
+            self._condicion.notify_all()
+            return elemento
+
+    def cerrar(self):
+        """Despertar a los productores bloqueados al detener el pipeline"""
+        with self._condicion:
+            self.cerrada = True
+            self._condicion.notify_all()
+
+    def vaciar(self):
+        with self._condicion:
+            self._elementos.clear()
+            self._condicion.notify_all()
+
+    def __len__(self):
+        return len(self._elementos)
\ No newline at end of file
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import deque
+
+class EscritorAlertas:
+    def __init__(self, almacen, intervalo_flush=0.5, tam_lote=200, fsync="normal",
+                 max_reintentos=5, espera_reintento=0.2):
+        self.almacen = almacen
+        self.intervalo_flush = intervalo_flush  # segundos máximos que una alerta espera en memoria
+        self.tam_lote = tam_lote
+        # Un lote que falla (p. ej. SQLITE_BUSY durante una rotación) vuelve al frente de la cola
+        # y se reintenta con espera creciente; solo se descarta al agotar los reintentos
+        self.max_reintentos = max_reintentos
+        self.espera_reintento = espera_reintento
+        # fsync: "cada_lote" (synchronous=FULL), "normal" (fsync en checkpoints WAL) o "nunca"
+        self.almacen.configurar_sincronizacion(fsync)
+
+        self._pendientes = deque()  # (patron_info, timestamp, instante de encolado)
+        self._condicion = threading.Condition()
+        self._activo = False
+        self._escribiendo = 0
+        self.hilo = None
+
+        self.encoladas = 0
+        self.escritas = 0
+        self.lotes = 0
+        self.errores = 0
+        self.descartadas = 0
+        self.ultimo_retraso = 0.0
+        self.retraso_maximo = 0.0
+
+    def iniciar(self):
+        self._activo = True
+        self.hilo = threading.Thread(target=self._bucle, daemon=True)
+        self.hilo.start()
+
+    def encolar(self, patron_info, timestamp):
+        """Dejar la alerta en memoria; nunca toca el disco en el hilo que llama"""
+        with self._condicion:
+            self._pendientes.append((patron_info, timestamp, time.perf_counter()))
+            self.encoladas += 1
+            if len(self._pendientes) >= self.tam_lote:
+                self._condicion.notify_all()
+
+    def pendientes(self):
+        """Alertas encoladas que aún no llegaron al almacén"""
+        with self._condicion:
+            return [(patron_info, timestamp) for patron_info, timestamp, _ in self._pendientes]
+
+    def _bucle(self):
+        reintentos = 0
+        while True:
+            with self._condicion:
+                if reintentos:
+                    limite = time.perf_counter() + min(self.espera_reintento * 2 ** (reintentos - 1), 5.0)
+                    while self._activo and time.perf_counter() < limite:
+                        self._condicion.wait(limite - time.perf_counter())
+                elif self._activo and len(self._pendientes) < self.tam_lote:
+                    self._condicion.wait(self.intervalo_flush)
+                if not self._pendientes:
+                    if not self._activo:
+                        return
+                    continue
+                lote = [self._pendientes.popleft() for _ in range(min(self.tam_lote, len(self._pendientes)))]
+                self._escribiendo = len(lote)
+
+            escrito = self._escribir(lote)
+
+            with self._condicion:
+                if escrito:
+                    reintentos = 0
+                elif reintentos < self.max_reintentos:
+                    reintentos += 1
+                    self._pendientes.extendleft(reversed(lote))
+                else:
+                    reintentos = 0
+                    self.descartadas += len(lote)
+                    print(f"Se descartaron {len(lote)} alertas tras {self.max_reintentos} reintentos")
+                self._escribiendo = 0
+                self._condicion.notify_all()
+
+    def _escribir(self, lote):
+        try:
+            self.almacen.guardar_lote([(patron_info, timestamp) for patron_info, timestamp, _ in lote])
+        except Exception as e:
+            self.errores += 1
+            print(f"Error guardando alertas (se reintentará): {e}")
+            return False
+
+        retraso = time.perf_counter() - lote[0][2]
+        self.escritas += len(lote)
+        self.lotes += 1
+        self.ultimo_retraso = retraso
+        self.retraso_maximo = max(self.retraso_maximo, retraso)
+        return True
+
+    def flush(self, timeout=5.0):
+        """Esperar a que todo lo encolado quede escrito"""
+        limite = time.perf_counter() + timeout
+        with self._condicion:
+            self._condicion.notify_all()
+            while self._pendientes or self._escribiendo:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    return False
+                self._condicion.wait(restante)
+        return True
+
+    def detener(self, timeout=5.0):
+        """Escribir lo pendiente y terminar el hilo"""
+        with self._condicion:
+            self._activo = False
+            self._condicion.notify_all()
+        if self.hilo:
+            self.hilo.join(timeout)
+            self.hilo = None
+
+    def obtener_estadisticas(self):
+        with self._condicion:
+            pendientes = len(self._pendientes) + self._escribiendo
+            retraso_actual = time.perf_counter() - self._pendientes[0][2] if self._pendientes else 0.0
+        return {
+            "encoladas": self.encoladas,
+            "escritas": self.escritas,
+            "pendientes": pendientes,
+            "lotes": self.lotes,
+            "errores": self.errores,
+            "descartadas": self.descartadas,
+            "retraso_ms": retraso_actual * 1000,           # antigüedad de la alerta pendiente más vieja
+            "ultimo_retraso_ms": self.ultimo_retraso * 1000,  # encolado -> escrito del último lote
+            "retraso_maximo_ms": self.retraso_maximo * 1000
+        }
\ No newline at end of file
@@ -0,0 +1,119 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+# Límites fijos de los buckets en ns: de 1 us a ~10 s, cuatro buckets por potencia de 2 (~19% de resolución)
+LIMITES_NS = [int(1000 * 2 ** (i / 4)) for i in range(94)]
+
+class Histograma:
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.conteos = [0] * (len(LIMITES_NS) + 1)  # el último bucket recoge lo que supera el límite mayor
+        self.total = 0
+        self.suma_ns = 0
+        self.maximo_ns = 0
+        self.fps = 0.0
+        self._inicio_ventana = time.perf_counter_ns()
+        self._total_ventana = 0
+
+    def registrar(self, duracion_ns, fin_ns):
+        """Sumar una medición a su bucket (sin locks: un escritor por etapa)"""
+        self.conteos[bisect_left(LIMITES_NS, duracion_ns)] += 1
+        self.total += 1
+        self.suma_ns += duracion_ns
+        if duracion_ns > self.maximo_ns:
+            self.maximo_ns = duracion_ns
+
+        transcurrido = fin_ns - self._inicio_ventana
+        if transcurrido >= 1_000_000_000:
+            self.fps = (self.total - self._total_ventana) * 1e9 / transcurrido
+            self._inicio_ventana = fin_ns
+            self._total_ventana = self.total
+
+    def percentil(self, p):
+        """Límite superior (ms) del bucket donde cae el percentil p, sin pasar del máximo observado"""
+        conteos = list(self.conteos)
+        total = sum(conteos)
+        if not total:
+            return 0.0
+        objetivo = total * p / 100
+        acumulado = 0
+        for i, conteo in enumerate(conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                limite = LIMITES_NS[i] if i < len(LIMITES_NS) else self.maximo_ns
+                return min(limite, self.maximo_ns) / 1e6
+        return self.maximo_ns / 1e6
+
+    def resumen(self):
+        # Sin mediciones en los últimos 2 s el fps no debe quedar congelado
+        if time.perf_counter_ns() - self._inicio_ventana >= 2_000_000_000:
+            self.fps = 0.0
+        return {
+            "total": self.total,
+            "fps": round(self.fps, 2),
+            "ms_promedio": round(self.suma_ns / self.total / 1e6, 4) if self.total else 0.0,
+            "p50_ms": round(self.percentil(50), 4),
+            "p95_ms": round(self.percentil(95), 4),
+            "p99_ms": round(self.percentil(99), 4),
+            "max_ms": round(self.maximo_ns / 1e6, 4)
+        }
+
+class Instrumentacion:
+    def __init__(self, activa=False):
+        self.activa = activa
+        self.histogramas = {}
+
+    def inicio(self):
+        """Marca de inicio de un span; 0 si la instrumentación está apagada"""
+        return time.perf_counter_ns() if self.activa else 0
+
+    def fin(self, nombre, inicio_ns):
+        """Cerrar un span abierto con inicio(); no hace nada si se abrió apagada"""
+        if not inicio_ns:
+            return
+        fin_ns = time.perf_counter_ns()
+        histograma = self.histogramas.get(nombre)
+        if histograma is None:
+            histograma = self.histogramas.setdefault(nombre, Histograma(nombre))
+        histograma.registrar(fin_ns - inicio_ns, fin_ns)
+
+    def activar(self):
+        self.activa = True
+
+    def desactivar(self):
+        self.activa = False
+
+    def reiniciar(self):
+        self.histogramas = {}
+
+    def resumen(self):
+        """p50/p95/p99, promedio y fps de cada span, en orden de nombre"""
+        histogramas = dict(self.histogramas)  # copia atómica: otros hilos pueden agregar spans
+        return {nombre: histogramas[nombre].resumen() for nombre in sorted(histogramas)}
+
+    def exportar_json(self, ruta=None, extra=None):
+        """Guardar el resumen (y los conteos crudos de cada bucket) en data/"""
+        if not ruta:
+            os.makedirs("data", exist_ok=True)
+            ruta = os.path.join("data", f"instrumentacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+        datos = {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "limites_ns": LIMITES_NS,
+            "spans": {
+                nombre: dict(histograma.resumen(), conteos=list(histograma.conteos))
+                for nombre, histograma in sorted(dict(self.histogramas).items())
+            }
+        }
+        if extra:
+            datos.update(extra)
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=2, ensure_ascii=False)
+        return ruta
+
+# Instancia compartida por el pipeline, los detectores y las ventanas.
+# Activable desde la ventana de estado, con --instrumentar o con INSTRUMENTACION=1
+INSTRUMENTACION = Instrumentacion(activa=os.environ.get("INSTRUMENTACION") == "1")
\ No newline at end of file
@@ -0,0 +1,121 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.instrumentacion import LIMITES_NS
+
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+
+# Para Prometheus se expone uno de cada cuatro límites (potencias de 2 desde 1 us):
+# los conteos acumulados siguen siendo exactos en esos cortes
+INDICES_EXPUESTOS = list(range(0, len(LIMITES_NS), 4))
+
+def puerto_desde_entorno(variable="METRICAS_PUERTO"):
+    """Puerto del endpoint si la variable de entorno lo define; None = desactivado"""
+    valor = os.environ.get(variable)
+    return int(valor) if valor else None
+
+def _etiquetas(etiquetas):
+    if not etiquetas:
+        return ""
+    pares = []
+    for clave, valor in etiquetas.items():
+        valor = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pares.append(f'{clave}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    if isinstance(valor, float):
+        return repr(valor)
+    return str(int(valor))
+
+def muestras_histograma(histograma, etiquetas=None):
+    """Muestras _bucket/_sum/_count (en segundos) de un Histograma de utils/instrumentacion.py"""
+    etiquetas = etiquetas or {}
+    conteos = list(histograma.conteos)  # copia sin lock: el hilo que mide sigue escribiendo
+    muestras = []
+    acumulado = 0
+    siguiente = 0
+    for indice in INDICES_EXPUESTOS:
+        acumulado += sum(conteos[siguiente:indice + 1])
+        siguiente = indice + 1
+        muestras.append(("_bucket", dict(etiquetas, le=repr(LIMITES_NS[indice] / 1e9)), acumulado))
+    total = acumulado + sum(conteos[siguiente:])
+    muestras.append(("_bucket", dict(etiquetas, le="+Inf"), total))
+    muestras.append(("_sum", etiquetas, histograma.suma_ns / 1e9))
+    muestras.append(("_count", etiquetas, total))
+    return muestras
+
+def familias_instrumentacion(instrumentacion):
+    """Histograma por span de la instrumentación (vacío mientras está apagada)"""
+    histogramas = dict(instrumentacion.histogramas)
+    if not histogramas:
+        return []
+    muestras = []
+    for nombre in sorted(histogramas):
+        muestras.extend(muestras_histograma(histogramas[nombre], {"span": nombre}))
+    return [("gestos_span_segundos", "histogram",
+             "Duración de cada span instrumentado del camino caliente", muestras)]
+
+def formatear_metricas(familias):
+    """Texto en formato de exposición de Prometheus a partir de
+    (nombre, tipo, ayuda, [(sufijo, etiquetas, valor), ...])"""
+    lineas = []
+    for nombre, tipo, ayuda, muestras in familias:
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        for sufijo, etiquetas, valor in muestras:
+            lineas.append(f"{nombre}{sufijo}{_etiquetas(etiquetas)} {_numero(valor)}")
+    return "\n".join(lineas) + "\n"
+
+class ServidorMetricas:
+    def __init__(self, recolector, puerto=9464, host="127.0.0.1"):
+        # recolector() devuelve las familias; se llama en el hilo del servidor en cada scrape
+        self.recolector = recolector
+        self.host = host
+        self.puerto = puerto
+        self.servidor = None
+        self.hilo = None
+        self.scrapes = 0
+        self.errores = 0
+
+    def iniciar(self):
+        """Escuchar en segundo plano; devuelve el puerto real (útil con puerto=0)"""
+        metricas = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                try:
+                    cuerpo = formatear_metricas(metricas.recolector()).encode("utf-8")
+                    metricas.scrapes += 1
+                except Exception as e:
+                    metricas.errores += 1
+                    self.send_error(500, str(e))
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", TIPO_CONTENIDO)
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer((self.host, self.puerto), Manejador)
+        self.servidor.daemon_threads = True
+        self.puerto = self.servidor.server_address[1]
+        self.hilo = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self.hilo.start()
+        return self.puerto
+
+    def detener(self):
+        if self.servidor:
+            self.servidor.shutdown()
+            self.servidor.server_close()
+            self.servidor = None
+            self.hilo = None
\ No newline at end of file
@@ -0,0 +1,109 @@
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+class PerfiladorMuestreo:
+    def __init__(self, directorio="data", duracion=10.0, intervalo=0.005):
+        # Muestreo de las pilas de todos los hilos (captura, inferencia, render y Tk)
+        # desde un hilo propio: apagado no existe ese hilo y no se mide nada
+        self.directorio = directorio
+        self.duracion = duracion      # segundos de cada captura
+        self.intervalo = intervalo    # segundos entre muestras
+        self.hilo = None
+        self.pilas = {}               # "hilo;archivo:funcion;..." -> muestras
+        self.muestras = 0
+        self.ultimo_archivo = None
+        self._fin = 0.0
+
+    def iniciar(self, duracion=None):
+        """Perfilar durante una ventana fija; devuelve False si ya hay una captura en curso"""
+        if self.esta_activo():
+            return False
+        self.pilas = {}
+        self.muestras = 0
+        self._fin = time.perf_counter() + (duracion or self.duracion)
+        self.hilo = threading.Thread(target=self._muestrear, daemon=True)
+        self.hilo.start()
+        return True
+
+    def esta_activo(self):
+        return self.hilo is not None and self.hilo.is_alive()
+
+    def esperar(self, timeout=None):
+        if self.hilo:
+            self.hilo.join(timeout)
+        return not self.esta_activo()
+
+    def detener(self, timeout=5.0):
+        """Cortar la captura en curso y esperar a que se guarde"""
+        self._fin = 0.0
+        return self.esperar(timeout)
+
+    def _muestrear(self):
+        propio = threading.get_ident()
+        while time.perf_counter() < self._fin:
+            nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                pila = self._colapsar(nombres.get(ident, str(ident)), frame)
+                self.pilas[pila] = self.pilas.get(pila, 0) + 1
+            self.muestras += 1
+            time.sleep(self.intervalo)
+
+        try:
+            self.ultimo_archivo = self._guardar()
+            print(f"Perfil guardado en {self.ultimo_archivo}", file=sys.stderr)
+        except Exception as e:
+            print(f"Error guardando perfil: {e}", file=sys.stderr)
+
+    @staticmethod
+    def _colapsar(nombre_hilo, frame):
+        """Pila en formato colapsado (raíz primero), como la usan los flame graphs"""
+        marcos = []
+        while frame is not None:
+            codigo = frame.f_code
+            marcos.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+            frame = frame.f_back
+        marcos.append(nombre_hilo.replace(" ", "_"))
+        return ";".join(reversed(marcos))
+
+    def _guardar(self):
+        """Escribir data/perfil_<fecha>.folded y un resumen .txt con las funciones más frecuentes"""
+        os.makedirs(self.directorio, exist_ok=True)
+        base = os.path.join(self.directorio, f"perfil_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            for pila, cantidad in sorted(self.pilas.items()):
+                f.write(f"{pila} {cantidad}\n")
+
+        propio, acumulado, por_hilo = {}, {}, {}
+        for pila, cantidad in self.pilas.items():
+            marcos = pila.split(";")
+            por_hilo[marcos[0]] = por_hilo.get(marcos[0], 0) + cantidad
+            if len(marcos) > 1:
+                propio[marcos[-1]] = propio.get(marcos[-1], 0) + cantidad
+            for marco in set(marcos[1:]):
+                acumulado[marco] = acumulado.get(marco, 0) + cantidad
+
+        lineas = [f"Muestras: {self.muestras} cada {self.intervalo * 1000:.1f} ms", "", "Por hilo:"]
+        lineas += [f"  {cantidad:7d}  {hilo}" for hilo, cantidad in sorted(por_hilo.items(), key=lambda x: -x[1])]
+        for titulo, conteos in (("Tiempo propio", propio), ("Tiempo acumulado", acumulado)):
+            lineas += ["", f"{titulo} (top 30):"]
+            for marco, cantidad in sorted(conteos.items(), key=lambda x: -x[1])[:30]:
+                porcentaje = 100 * cantidad / self.muestras if self.muestras else 0
+                lineas.append(f"  {cantidad:7d}  {porcentaje:5.1f}%  {marco}")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lineas) + "\n")
+
+        return base + ".folded"
+
+    def instalar_senal(self):
+        """kill -USR1 <pid> inicia una captura (solo POSIX, desde el hilo principal)"""
+        if not hasattr(signal, "SIGUSR1"):
+            return False
+        signal.signal(signal.SIGUSR1, lambda numero, frame: self.iniciar())
+        return True
\ No newline at end of file
@@ -0,0 +1,145 @@
+import argparse
+import json
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from config.patrones_auxilio import PatronesAuxilio
+from kmp.monitor_patrones import MonitorPatrones
+from vision.detector_gestos import DetectorGestos
+from vision.procesador_eventos import ProcesadorEventos
+
+PUNTOS_MANO = 21
+
+# Misma interfaz (x, y, z) que los landmarks de MediaPipe que usa count_fingers
+Punto = namedtuple("Punto", "x y z")
+
+class GrabadorLandmarks:
+    def __init__(self, ruta, max_manos=2, capacidad_inicial=1024):
+        self.ruta = ruta
+        self.max_manos = max_manos
+        self.total = 0
+
+        # Arreglos preasignados que crecen al doble: sin un objeto Python por frame
+        self.tiempos = np.empty(capacidad_inicial, dtype=np.float64)
+        self.num_manos = np.empty(capacidad_inicial, dtype=np.uint8)
+        self.landmarks = np.empty((capacidad_inicial, max_manos, PUNTOS_MANO, 3), dtype=np.float32)
+
+    def _crecer(self):
+        capacidad = len(self.tiempos) * 2
+        self.tiempos = np.resize(self.tiempos, capacidad)
+        self.num_manos = np.resize(self.num_manos, capacidad)
+        landmarks = np.empty((capacidad,) + self.landmarks.shape[1:], dtype=np.float32)
+        landmarks[:self.total] = self.landmarks[:self.total]
+        self.landmarks = landmarks
+
+    def agregar(self, tiempo, manos):
+        """Registrar un frame con la lista [(hand_landmarks, gesto)] que devuelve DetectorGestos.detectar"""
+        if self.total == len(self.tiempos):
+            self._crecer()
+
+        i = self.total
+        n = min(len(manos), self.max_manos)
+        self.tiempos[i] = tiempo
+        self.num_manos[i] = n
+        self.landmarks[i, n:] = 0
+        for h in range(n):
+            hand_landmarks = manos[h][0]
+            self.landmarks[i, h] = [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+        self.total += 1
+
+    def guardar(self):
+        """Escribir los frames registrados en un .npz comprimido"""
+        np.savez_compressed(
+            self.ruta,
+            tiempos=self.tiempos[:self.total],
+            num_manos=self.num_manos[:self.total],
+            landmarks=self.landmarks[:self.total]
+        )
+        return self.ruta
+
+def cargar_landmarks(ruta):
+    """Leer un archivo de GrabadorLandmarks; devuelve (tiempos, num_manos, landmarks)"""
+    with np.load(ruta) as datos:
+        return datos["tiempos"], datos["num_manos"], datos["landmarks"]
+
+class ReproductorLandmarks:
+    def __init__(self, ruta, procesador_eventos=None, patrones_auxilio=None):
+        self.tiempos, self.num_manos, self.landmarks = cargar_landmarks(ruta)
+        self.procesador_eventos = procesador_eventos or ProcesadorEventos()
+        self.monitor_patrones = MonitorPatrones(patrones_auxilio or PatronesAuxilio(), self.procesador_eventos)
+
+    def clasificar(self, indice):
+        """count_fingers -> recognize_gesture sobre las manos guardadas, como DetectorGestos._inferir"""
+        gesto_detectado = None
+        for h in range(self.num_manos[indice]):
+            puntos = [Punto(*p) for p in self.landmarks[indice, h].tolist()]
+            gesto = DetectorGestos.recognize_gesture(DetectorGestos.count_fingers(puntos))
+            if gesto:
+                gesto_detectado = gesto
+        return gesto_detectado
+
+    def clasificar_todos(self):
+        """Mismo resultado que clasificar() para todos los frames a la vez con la tabla de máscaras"""
+        n_frames, max_manos = self.landmarks.shape[:2]
+        mascaras = DetectorGestos.count_fingers_batch(self.landmarks.reshape(-1, PUNTOS_MANO, 3))
+        gestos_mano = DetectorGestos.recognize_gesture_batch(mascaras).reshape(n_frames, max_manos)
+
+        # Como en _inferir, gana el último gesto válido entre las manos del frame
+        gestos = np.full(n_frames, None, dtype=object)
+        for h in range(max_manos):
+            validos = (self.num_manos > h) & gestos_mano[:, h].astype(bool)
+            gestos[validos] = gestos_mano[validos, h]
+        return gestos
+
+    def ejecutar(self, vectorizado=True):
+        """Reproducir todos los frames sin MediaPipe y devolver gestos, alertas y throughput"""
+        gestos = []
+        alertas = []
+        inicio = time.perf_counter()
+
+        gestos_frame = self.clasificar_todos() if vectorizado else None
+        for i in range(len(self.tiempos)):
+            gesto = gestos_frame[i] if vectorizado else self.clasificar(i)
+            if not gesto:
+                continue
+
+            tiempo = float(self.tiempos[i])
+            letra_confirmada, patrones_detectados = self.monitor_patrones.procesar_gesto(gesto, tiempo)
+            if letra_confirmada:
+                gestos.append({"frame": i, "t": round(tiempo, 3), "letra": letra_confirmada})
+            for patron_info in patrones_detectados:
+                alertas.append({"frame": i, "t": round(tiempo, 3), "nombre": patron_info["nombre"]})
+
+        duracion = time.perf_counter() - inicio
+        return {
+            "frames": len(self.tiempos),
+            "duracion_s": round(duracion, 4),
+            "fps": round(len(self.tiempos) / duracion, 1) if duracion > 0 else None,
+            "gestos": gestos,
+            "alertas": alertas
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-ejecutar gestos y patrones desde landmarks grabados, sin MediaPipe")
+    parser.add_argument("archivo", help="archivo .npz generado con servidor_headless.py --grabar-landmarks")
+    parser.add_argument("--frames-confirmar", type=int, help="sobrescribe ProcesadorEventos.frames_para_confirmar")
+    parser.add_argument("--tiempo-repeticion", type=float, help="sobrescribe ProcesadorEventos.tiempo_repeticion")
+    parser.add_argument("--sin-vectorizar", action="store_true",
+                        help="clasificar frame a frame con count_fingers/recognize_gesture")
+    args = parser.parse_args(argv)
+
+    procesador = ProcesadorEventos()
+    if args.frames_confirmar is not None:
+        procesador.frames_para_confirmar = args.frames_confirmar
+    if args.tiempo_repeticion is not None:
+        procesador.tiempo_repeticion = args.tiempo_repeticion
+
+    informe = ReproductorLandmarks(args.archivo, procesador).ejecutar(vectorizado=not args.sin_vectorizar)
+    json.dump(informe, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
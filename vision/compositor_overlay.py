@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+
+FUENTE = cv2.FONT_HERSHEY_SIMPLEX
+
+class CompositorOverlay:
+    def __init__(self):
+        # Textos fijos por capa: (texto, posición según (alto, ancho), escala, color, grosor)
+        self.capas = {
+            "base": [
+                ("Sistema de Deteccion de Auxilio",
+                 lambda alto, ancho: (10, 30), 0.7, (255, 255, 255), 2),
+                ("A: Mano abierta | B: 3 dedos | C: Puño | D: Pulgar medico",
+                 lambda alto, ancho: (10, alto - 10), 0.5, (255, 255, 255), 1)
+            ],
+            "registrado": [
+                ("✓ Gesto registrado",
+                 lambda alto, ancho: (10, 60), 0.7, (255, 200, 0), 2)
+            ]
+        }
+        # (capa, forma del frame) -> [(y0, y1, x0, x1, pixeles, mascara)]
+        self.cache = {}
+
+    def _renderizar(self, nombre, forma):
+        """Dibujar una capa una sola vez y quedarse solo con el recorte de cada texto"""
+        alto, ancho = forma[:2]
+        regiones = []
+        for texto, posicion, escala, color, grosor in self.capas[nombre]:
+            lienzo = np.zeros(forma, dtype=np.uint8)
+            mascara = np.zeros((alto, ancho), dtype=np.uint8)
+            cv2.putText(lienzo, texto, posicion(alto, ancho), FUENTE, escala, color, grosor)
+            cv2.putText(mascara, texto, posicion(alto, ancho), FUENTE, escala, 255, grosor)
+
+            filas = np.flatnonzero(mascara.any(axis=1))
+            columnas = np.flatnonzero(mascara.any(axis=0))
+            if not len(filas):
+                continue
+            y0, y1 = filas[0], filas[-1] + 1
+            x0, x1 = columnas[0], columnas[-1] + 1
+            regiones.append((
+                y0, y1, x0, x1,
+                lienzo[y0:y1, x0:x1].copy(),
+                (mascara[y0:y1, x0:x1] > 0)[..., None]
+            ))
+        return regiones
+
+    def aplicar(self, frame, nombre="base"):
+        """Copiar en el frame, en sitio, los píxeles de la capa cacheada para su resolución"""
+        clave = (nombre, frame.shape)
+        regiones = self.cache.get(clave)
+        if regiones is None:
+            regiones = self._renderizar(nombre, frame.shape)
+            self.cache[clave] = regiones
+
+        for y0, y1, x0, x1, pixeles, mascara in regiones:
+            np.copyto(frame[y0:y1, x0:x1], pixeles, where=mascara)
+        return frame
\ No newline at end of file
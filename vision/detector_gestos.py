@@ -2,9 +2,19 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import time
+from vision.compositor_overlay import CompositorOverlay
+from utils.instrumentacion import INSTRUMENTACION
+
+# Índices de landmarks usados para contar dedos (pulgar, luego índice a meñique)
+PUNTAS_DEDOS = [8, 12, 16, 20]
+BASES_DEDOS = [6, 10, 14, 18]
+PUNTA_PULGAR = 4
+BASE_PULGAR = 2
 
 class DetectorGestos:
-    def __init__(self):
+    def __init__(self, inferencia_adaptativa=True, fps_inferencia_objetivo=None,
+                 intervalo_maximo=4, umbral_confianza=0.8,
+                 seguimiento_roi=False, factor_roi=1.6, periodo_redeteccion=15):
         # Configuración de MediaPipe Hands
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
@@ -28,13 +38,49 @@ class DetectorGestos:
         self.tiempo_inicio_color = 0
         self.duracion_color = 0.5
         
-    def count_fingers(self, landmarks):
+        # Título y leyenda se dibujan una vez por resolución y se copian en cada frame
+        self.compositor = CompositorOverlay()
+        
+        # Inferencia adaptativa: reutilizar landmarks mientras el resultado es estable
+        self.inferencia_adaptativa = inferencia_adaptativa
+        self.fps_inferencia_objetivo = fps_inferencia_objetivo  # presupuesto de CPU (None = sin límite)
+        self.intervalo_maximo = intervalo_maximo                # máximo de frames por inferencia
+        self.umbral_confianza = umbral_confianza
+        self.intervalo_inferencia = 1
+        self.frames_desde_inferencia = 0
+        self.inferencias_estables = 0
+        self.ultimo_tiempo_inferencia = None
+        self.ultimas_manos = []
+        self.ultimo_gesto = None
+        self.inferencias_realizadas = 0
+        self.frames_reutilizados = 0
+        
+        # Región de interés: inferir solo alrededor de la última caja de la mano
+        self.seguimiento_roi = seguimiento_roi
+        self.factor_roi = factor_roi                    # expansión de la caja anterior
+        self.periodo_redeteccion = periodo_redeteccion  # inferencias entre re-detecciones completas
+        self.tamano_minimo_roi = 96
+        self.caja_roi = None
+        # Los recortes cambian de origen y tamaño en cada frame: el modo tracking de MediaPipe
+        # arrastraría el ROI interno de la imagen anterior, así que van a una instancia estática
+        # y la de tracking solo ve frames completos
+        self.hands_roi = self.mp_hands.Hands(
+            static_image_mode=True,
+            max_num_hands=1,
+            min_detection_confidence=0.5
+        ) if seguimiento_roi else None
+        self.inferencias_desde_redeteccion = 0
+        self.inferencias_roi = 0
+        self.redetecciones = 0
+        
+    @staticmethod
+    def count_fingers(landmarks):
         """Contar dedos levantados basado en los landmarks"""
-        finger_tips = [8, 12, 16, 20]  # puntas de dedos (excepto pulgar)
-        finger_dips = [6, 10, 14, 18]  # bases de dedos
+        finger_tips = PUNTAS_DEDOS  # puntas de dedos (excepto pulgar)
+        finger_dips = BASES_DEDOS   # bases de dedos
         
-        thumb_tip = 4
-        thumb_ip = 2
+        thumb_tip = PUNTA_PULGAR
+        thumb_ip = BASE_PULGAR
         
         fingers = []
         
@@ -53,7 +99,8 @@ class DetectorGestos:
                 
         return fingers
     
-    def recognize_gesture(self, fingers):
+    @staticmethod
+    def recognize_gesture(fingers):
         """Reconocer gestos de auxilio específicos"""
         total_fingers = sum(fingers)
         
@@ -85,6 +132,23 @@ class DetectorGestos:
         else:
             return None
     
+    @staticmethod
+    def count_fingers_batch(landmarks):
+        """Máscara de 5 bits (pulgar = bit 0) por mano para un arreglo (N, 21, 3) de landmarks"""
+        landmarks = np.asarray(landmarks)
+        pulgar = landmarks[:, PUNTA_PULGAR, 0] < landmarks[:, BASE_PULGAR, 0]
+        dedos = landmarks[:, PUNTAS_DEDOS, 1] < landmarks[:, BASES_DEDOS, 1]
+        
+        mascaras = pulgar.astype(np.uint8)
+        for bit in range(4):
+            mascaras |= dedos[:, bit].astype(np.uint8) << (bit + 1)
+        return mascaras
+    
+    @staticmethod
+    def recognize_gesture_batch(mascaras):
+        """Gesto (o None) de cada máscara de count_fingers_batch con una sola indexación"""
+        return TABLA_GESTOS[mascaras]
+    
     def activar_efecto_color(self):
         """Activar el efecto de color azul por 0.5 segundos"""
         self.efecto_color_activo = True
@@ -106,95 +170,236 @@ class DetectorGestos:
     
     def process_frame(self, frame, gesto_confirmado=False):
         """Procesar un frame y reconocer gestos"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        manos, gesture_detected = self.detectar(frame)
+        annotated_frame = self.dibujar(frame, manos, gesto_confirmado)
+        return annotated_frame, gesture_detected
+    
+    def detectar(self, frame):
+        """Inferencia y clasificación: devuelve [(hand_landmarks, gesto)] y el gesto detectado"""
+        self.frames_desde_inferencia += 1
+        
+        if not self._debe_inferir():
+            self.frames_reutilizados += 1
+            return self.ultimas_manos, self.ultimo_gesto
+            
+        manos, gesture_detected, confianza = self._inferir(frame)
+        self._ajustar_intervalo(gesture_detected, confianza)
         
+        self.ultimas_manos = manos
+        self.ultimo_gesto = gesture_detected
+        self.frames_desde_inferencia = 0
+        self.ultimo_tiempo_inferencia = time.perf_counter()
+        self.inferencias_realizadas += 1
+        
+        return manos, gesture_detected
+    
+    def _inferir(self, frame):
+        """Ejecutar MediaPipe y clasificar cada mano; devuelve también la confianza mínima"""
+        h, w = frame.shape[:2]
+        region = self._region_interes(w, h)
+        results = self._procesar_region(frame, region)
+        
+        if region is not None and not results.multi_hand_landmarks:
+            # La mano salió del ROI: re-detección en el frame completo
+            region = None
+            results = self._procesar_region(frame, None)
+            
+        self._actualizar_roi(results, region, w, h)
+        
+        manos = []
         gesture_detected = None
-        annotated_frame = frame.copy()
-
+        confianza = 1.0
+        
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
                 landmarks = hand_landmarks.landmark
                 
+                span = INSTRUMENTACION.inicio()
                 fingers = self.count_fingers(landmarks)
                 gesture = self.recognize_gesture(fingers)
+                INSTRUMENTACION.fin("2_inferencia.clasificacion", span)
                 
                 if gesture:
                     gesture_detected = gesture
-                    efecto_activo = self.efecto_color_esta_activo()
-                    
-                    # Definir colores según el estado
-                    if efecto_activo:
-                        color_landmarks = (255, 200, 0)
-                        color_conexiones = (255, 150, 0)
-                        color_bbox = (255, 100, 0)
-                        color_texto = (255, 100, 0)
-                    elif gesto_confirmado:
-                        color_landmarks = (0, 255, 255)
-                        color_conexiones = (0, 200, 200)
-                        color_bbox = (0, 255, 255)
-                        color_texto = (0, 255, 255)
-                    else:
-                        color_landmarks = (0, 255, 0)
-                        color_conexiones = (0, 200, 0)
-                        color_bbox = (0, 255, 0)
-                        color_texto = (0, 255, 0)
-                    
-                    # Dibujar landmarks y conexiones
-                    self.mp_drawing.draw_landmarks(
-                        annotated_frame, 
-                        hand_landmarks, 
-                        self.mp_hands.HAND_CONNECTIONS,
-                        self.mp_drawing.DrawingSpec(color=color_landmarks, thickness=3, circle_radius=4),
-                        self.mp_drawing.DrawingSpec(color=color_conexiones, thickness=3)
-                    )
-                    
-                    # Dibujar información del gesto
-                    h, w, _ = frame.shape
-                    bbox = self.calculate_bounding_box(landmarks, w, h)
-                    
-                    cv2.rectangle(annotated_frame, 
-                                (bbox[0], bbox[1]), 
-                                (bbox[2], bbox[3]), 
-                                color_bbox, 3)
-                    
-                    nombre_gesto = self.gestures.get(gesture, "Desconocido")
-                    texto_gesto = f"Gesto: {gesture} - {nombre_gesto}"
-                    
-                    if efecto_activo:
-                        texto_gesto += "  DETECTADO"
-                    elif gesto_confirmado:
-                        texto_gesto += " ✔"
-                    
-                    cv2.putText(annotated_frame, 
-                              texto_gesto, 
-                              (bbox[0], bbox[1] - 10), 
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.7, color_texto, 2)
+                manos.append((hand_landmarks, gesture))
+                
+        if results.multi_handedness:
+            confianza = min(mano.classification[0].score for mano in results.multi_handedness)
+                
+        return manos, gesture_detected, confianza
+    
+    def _region_interes(self, width, height):
+        """Caja anterior expandida, o None si toca inferir sobre el frame completo"""
+        if (not self.seguimiento_roi or self.caja_roi is None or
+                self.inferencias_desde_redeteccion >= self.periodo_redeteccion):
+            return None
+            
+        x_min, y_min, x_max, y_max = self.caja_roi
+        centro_x = (x_min + x_max) / 2
+        centro_y = (y_min + y_max) / 2
+        lado_x = max((x_max - x_min) * self.factor_roi, self.tamano_minimo_roi) / 2
+        lado_y = max((y_max - y_min) * self.factor_roi, self.tamano_minimo_roi) / 2
+        
+        x0 = max(0, int(centro_x - lado_x))
+        y0 = max(0, int(centro_y - lado_y))
+        x1 = min(width, int(centro_x + lado_x))
+        y1 = min(height, int(centro_y + lado_y))
+        
+        if x1 - x0 >= width and y1 - y0 >= height:
+            return None
+        return (x0, y0, x1, y1)
+    
+    def _procesar_region(self, frame, region):
+        """Pasar a MediaPipe el frame completo o un recorte, con landmarks en coordenadas del frame"""
+        if region is None:
+            span = INSTRUMENTACION.inicio()
+            results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            INSTRUMENTACION.fin("2_inferencia.mediapipe", span)
+            return results
+            
+        x0, y0, x1, y1 = region
+        h, w = frame.shape[:2]
+        ancho, alto = x1 - x0, y1 - y0
+        span = INSTRUMENTACION.inicio()
+        results = self.hands_roi.process(cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB))
+        INSTRUMENTACION.fin("2_inferencia.mediapipe", span)
+        
+        # Landmarks normalizados al recorte -> normalizados al frame completo
+        if results.multi_hand_landmarks:
+            for hand_landmarks in results.multi_hand_landmarks:
+                for lm in hand_landmarks.landmark:
+                    lm.x = (x0 + lm.x * ancho) / w
+                    lm.y = (y0 + lm.y * alto) / h
+                    lm.z = lm.z * ancho / w
                     
-                    if efecto_activo:
-                        cv2.putText(annotated_frame,
-                                  "Agregado a secuencia",
-                                  (bbox[0], bbox[3] + 25),
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.6, color_texto, 2)
-        
-        # Información general en el frame
-        cv2.putText(annotated_frame, 
-                   "Sistema de Deteccion de Auxilio", 
-                   (10, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        return results
+    
+    def _actualizar_roi(self, results, region, width, height):
+        """Guardar la caja de la mano para el próximo frame y contar re-detecciones"""
+        if not self.seguimiento_roi:
+            return
+            
+        if region is None:
+            self.inferencias_desde_redeteccion = 0
+            self.redetecciones += 1
+        else:
+            self.inferencias_desde_redeteccion += 1
+            self.inferencias_roi += 1
+            
+        if results.multi_hand_landmarks:
+            landmarks = results.multi_hand_landmarks[0].landmark
+            self.caja_roi = self.calculate_bounding_box(landmarks, width, height)
+        else:
+            self.caja_roi = None
+    
+    def _debe_inferir(self):
+        """Decidir si este frame pasa por MediaPipe o reutiliza el último resultado"""
+        if self.ultimo_tiempo_inferencia is None:
+            return True
+            
+        # Presupuesto de CPU: nunca superar los fps de inferencia objetivo
+        if self.fps_inferencia_objetivo:
+            transcurrido = time.perf_counter() - self.ultimo_tiempo_inferencia
+            if transcurrido < 1.0 / self.fps_inferencia_objetivo:
+                return False
+                
+        if not self.inferencia_adaptativa:
+            return True
+            
+        return self.frames_desde_inferencia >= self.intervalo_inferencia
+    
+    def _ajustar_intervalo(self, gesto, confianza):
+        """Subir la frecuencia si el gesto cambia o baja la confianza; bajarla si es estable"""
+        if gesto != self.ultimo_gesto or confianza < self.umbral_confianza:
+            self.intervalo_inferencia = 1
+            self.inferencias_estables = 0
+        else:
+            self.inferencias_estables += 1
+            if self.inferencias_estables >= 2:
+                self.intervalo_inferencia = min(self.intervalo_inferencia + 1, self.intervalo_maximo)
+                self.inferencias_estables = 0
+    
+    def obtener_estadisticas_inferencia(self):
+        """Inferencias ejecutadas frente a frames que reutilizaron el resultado anterior"""
+        return {
+            "inferencias": self.inferencias_realizadas,
+            "reutilizados": self.frames_reutilizados,
+            "intervalo": self.intervalo_inferencia,
+            "inferencias_roi": self.inferencias_roi,
+            "redetecciones": self.redetecciones
+        }
+    
+    def dibujar(self, frame, manos, gesto_confirmado=False, en_sitio=False):
+        """Dibujar landmarks, caja y textos sobre una copia del frame (o sobre el propio frame)"""
+        annotated_frame = frame if en_sitio else frame.copy()
         
-        if self.efecto_color_esta_activo():
-            cv2.putText(annotated_frame,
-                      "✓ Gesto registrado",
-                      (10, 60),
-                      cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 200, 0), 2)
+        for hand_landmarks, gesture in manos:
+            landmarks = hand_landmarks.landmark
+            
+            if gesture:
+                efecto_activo = self.efecto_color_esta_activo()
+                
+                # Definir colores según el estado
+                if efecto_activo:
+                    color_landmarks = (255, 200, 0)
+                    color_conexiones = (255, 150, 0)
+                    color_bbox = (255, 100, 0)
+                    color_texto = (255, 100, 0)
+                elif gesto_confirmado:
+                    color_landmarks = (0, 255, 255)
+                    color_conexiones = (0, 200, 200)
+                    color_bbox = (0, 255, 255)
+                    color_texto = (0, 255, 255)
+                else:
+                    color_landmarks = (0, 255, 0)
+                    color_conexiones = (0, 200, 0)
+                    color_bbox = (0, 255, 0)
+                    color_texto = (0, 255, 0)
+                
+                # Dibujar landmarks y conexiones
+                self.mp_drawing.draw_landmarks(
+                    annotated_frame, 
+                    hand_landmarks, 
+                    self.mp_hands.HAND_CONNECTIONS,
+                    self.mp_drawing.DrawingSpec(color=color_landmarks, thickness=3, circle_radius=4),
+                    self.mp_drawing.DrawingSpec(color=color_conexiones, thickness=3)
+                )
+                
+                # Dibujar información del gesto
+                h, w, _ = frame.shape
+                bbox = self.calculate_bounding_box(landmarks, w, h)
+                
+                cv2.rectangle(annotated_frame, 
+                            (bbox[0], bbox[1]), 
+                            (bbox[2], bbox[3]), 
+                            color_bbox, 3)
+                
+                nombre_gesto = self.gestures.get(gesture, "Desconocido")
+                texto_gesto = f"Gesto: {gesture} - {nombre_gesto}"
+                
+                if efecto_activo:
+                    texto_gesto += "  DETECTADO"
+                elif gesto_confirmado:
+                    texto_gesto += " ✔"
+                
+                cv2.putText(annotated_frame, 
+                          texto_gesto, 
+                          (bbox[0], bbox[1] - 10), 
+                          cv2.FONT_HERSHEY_SIMPLEX, 0.7, color_texto, 2)
+                
+                if efecto_activo:
+                    cv2.putText(annotated_frame,
+                              "Agregado a secuencia",
+                              (bbox[0], bbox[3] + 25),
+                              cv2.FONT_HERSHEY_SIMPLEX, 0.6, color_texto, 2)
         
-        cv2.putText(annotated_frame, 
-                   "A: Mano abierta | B: 3 dedos | C: Puño | D: Pulgar medico", 
-                   (10, annotated_frame.shape[0] - 10), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        # Información general en el frame (capas estáticas cacheadas)
+        self.compositor.aplicar(annotated_frame, "base")
         
-        return annotated_frame, gesture_detected
+        if self.efecto_color_esta_activo():
+            self.compositor.aplicar(annotated_frame, "registrado")
+        
+        return annotated_frame
     
     def calculate_bounding_box(self, landmarks, width, height):
         """Calcular bounding box alrededor de la mano"""
@@ -211,4 +416,14 @@ class DetectorGestos:
         x_max = min(width, x_max + margin)
         y_max = min(height, y_max + margin)
         
-        return (x_min, y_min, x_max, y_max)
\ No newline at end of file
+        return (x_min, y_min, x_max, y_max)
+
+def _construir_tabla_gestos():
+    """Tabla de 32 entradas: recognize_gesture evaluado en cada combinación de dedos"""
+    tabla = np.empty(32, dtype=object)
+    for mascara in range(32):
+        dedos = [(mascara >> bit) & 1 for bit in range(5)]
+        tabla[mascara] = DetectorGestos.recognize_gesture(dedos)
+    return tabla
+
+TABLA_GESTOS = _construir_tabla_gestos()
\ No newline at end of file
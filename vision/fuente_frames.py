@@ -0,0 +1,62 @@
+import os
+import cv2
+
+EXTENSIONES_IMAGEN = (".jpg", ".jpeg", ".png", ".bmp")
+
+class FuenteDirectorio:
+    def __init__(self, ruta, fps=15):
+        # Imágenes en orden alfabético, con la misma interfaz que cv2.VideoCapture
+        self.archivos = sorted(
+            os.path.join(ruta, nombre)
+            for nombre in os.listdir(ruta)
+            if nombre.lower().endswith(EXTENSIONES_IMAGEN)
+        )
+        self.fps = fps
+        self.indice = 0
+        self.abierta = True
+
+    def isOpened(self):
+        return self.abierta and self.indice < len(self.archivos)
+
+    def read(self):
+        """Leer la siguiente imagen legible del directorio"""
+        while self.indice < len(self.archivos):
+            frame = cv2.imread(self.archivos[self.indice])
+            self.indice += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def get(self, propiedad):
+        if propiedad == cv2.CAP_PROP_FPS:
+            return self.fps
+        if propiedad == cv2.CAP_PROP_POS_FRAMES:
+            return self.indice
+        if propiedad == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.archivos)
+        return 0
+
+    def set(self, propiedad, valor):
+        return False
+
+    def release(self):
+        self.abierta = False
+
+def es_camara(fuente):
+    """Un entero (o texto con un entero) es un índice de cámara"""
+    return isinstance(fuente, int) or str(fuente).isdigit()
+
+def abrir_fuente(fuente, ancho=640, alto=480, fps=15):
+    """Abrir una cámara por índice, un archivo de video o un directorio de imágenes"""
+    if es_camara(fuente):
+        cap = cv2.VideoCapture(int(fuente))
+        if cap.isOpened():
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, ancho)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, alto)
+            cap.set(cv2.CAP_PROP_FPS, fps)
+        return cap
+
+    if os.path.isdir(fuente):
+        return FuenteDirectorio(fuente, fps)
+
+    return cv2.VideoCapture(fuente)
\ No newline at end of file
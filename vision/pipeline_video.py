@@ -0,0 +1,211 @@
+import threading
+import time
+import cv2
+from utils.cola_acotada import ColaDescartaAntiguos, ColaSinPerdidas
+from utils.instrumentacion import INSTRUMENTACION, Histograma
+
+class EstadisticasEtapa:
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.procesados = 0
+        self.tiempo_total = 0.0
+        self.fps = 0.0
+        self._inicio_ventana = time.perf_counter()
+        self._procesados_ventana = 0
+        # Siempre activo (una búsqueda binaria por frame): lo lee el endpoint de métricas
+        self.histograma = Histograma(nombre)
+
+    def registrar(self, duracion):
+        """Registrar un elemento procesado y recalcular fps cada segundo"""
+        self.procesados += 1
+        self.tiempo_total += duracion
+        self._procesados_ventana += 1
+
+        ahora = time.perf_counter()
+        self.histograma.registrar(int(duracion * 1e9), int(ahora * 1e9))
+        transcurrido = ahora - self._inicio_ventana
+        if transcurrido >= 1.0:
+            self.fps = self._procesados_ventana / transcurrido
+            self._inicio_ventana = ahora
+            self._procesados_ventana = 0
+
+    def resumen(self):
+        # Si la etapa se detuvo, el fps de la última ventana no debe quedar congelado
+        transcurrido = time.perf_counter() - self._inicio_ventana
+        if transcurrido >= 2.0:
+            self.fps = self._procesados_ventana / transcurrido
+        ms_promedio = (self.tiempo_total / self.procesados * 1000) if self.procesados else 0.0
+        return {
+            "fps": self.fps,
+            "ms_promedio": ms_promedio,
+            "procesados": self.procesados
+        }
+
+class PipelineVideo:
+    def __init__(self, cap, detector_gestos, procesador_eventos, al_gesto, al_frame, tam_cola=2,
+                 reproduccion=False, ritmo_fuente=False):
+        self.cap = cap
+        self.detector_gestos = detector_gestos
+        self.procesador_eventos = procesador_eventos
+        self.al_gesto = al_gesto    # llamado desde el hilo de inferencia con (gesto, tiempo)
+        self.al_frame = al_frame    # llamado desde el hilo de render con (frame_procesado, gesto)
+
+        # En reproducción se procesan todos los frames con el tiempo del propio video,
+        # a máxima velocidad o al ritmo de la fuente
+        self.reproduccion = reproduccion
+        self.ritmo_fuente = ritmo_fuente
+
+        if reproduccion:
+            self.cola_inferencia = ColaSinPerdidas(tam_cola)
+            self.cola_render = ColaSinPerdidas(tam_cola)
+        else:
+            # Colas acotadas entre etapas: si una etapa se atrasa se descarta el frame más viejo
+            self.cola_inferencia = ColaDescartaAntiguos(tam_cola)
+            self.cola_render = ColaDescartaAntiguos(tam_cola)
+
+        self.estadisticas = {
+            "captura": EstadisticasEtapa("captura"),
+            "inferencia": EstadisticasEtapa("inferencia"),
+            "render": EstadisticasEtapa("render")
+        }
+
+        # Sin ninguna ventana mostrando el video no se dibuja el overlay
+        self.anotar = True
+        self.frames_sin_anotar = 0
+
+        self.activo = False
+        self.fin_captura = False
+        self.fin_inferencia = False
+        self.hilos = []
+
+    def iniciar(self):
+        """Lanzar un hilo por etapa"""
+        self.activo = True
+        self.fin_captura = False
+        self.fin_inferencia = False
+        self.hilos = [
+            threading.Thread(target=self._etapa_captura, daemon=True),
+            threading.Thread(target=self._etapa_inferencia, daemon=True),
+            threading.Thread(target=self._etapa_render, daemon=True)
+        ]
+        for hilo in self.hilos:
+            hilo.start()
+
+    def detener(self, timeout=1.0):
+        """Detener las etapas y esperar a que terminen sus hilos"""
+        self.activo = False
+        self.cola_inferencia.cerrar()
+        self.cola_render.cerrar()
+        for hilo in self.hilos:
+            if hilo is not threading.current_thread():
+                hilo.join(timeout)
+        self.hilos = []
+        self.cola_inferencia.vaciar()
+        self.cola_render.vaciar()
+
+    def esperar(self, timeout=None):
+        """Esperar a que las etapas terminen de procesar toda la fuente"""
+        for hilo in self.hilos:
+            if hilo is not threading.current_thread():
+                hilo.join(timeout)
+        return not any(hilo.is_alive() for hilo in self.hilos)
+
+    def esta_activo(self):
+        return self.activo
+
+    def _etapa_captura(self):
+        """Leer y voltear frames de la cámara"""
+        estadisticas = self.estadisticas["captura"]
+        fps_fuente = self.cap.get(cv2.CAP_PROP_FPS) or 15
+        indice = 0
+        inicio_fuente = time.perf_counter()
+        while self.activo and self.cap.isOpened():
+            try:
+                if self.ritmo_fuente:
+                    espera = inicio_fuente + indice / fps_fuente - time.perf_counter()
+                    if espera > 0:
+                        time.sleep(espera)
+
+                inicio = time.perf_counter()
+                span = INSTRUMENTACION.inicio()
+                ret, frame = self.cap.read()
+                INSTRUMENTACION.fin("1_captura.lectura", span)
+                if not ret:
+                    break
+
+                span = INSTRUMENTACION.inicio()
+                frame = cv2.flip(frame, 1)
+                INSTRUMENTACION.fin("1_captura.espejo", span)
+                estadisticas.registrar(time.perf_counter() - inicio)
+
+                # En vivo ProcesadorEventos usa el reloj real; en reproducción, el tiempo del video
+                tiempo = indice / fps_fuente if self.reproduccion else None
+                indice += 1
+                self.cola_inferencia.put((frame, tiempo))
+            except Exception:
+                pass
+        # Las etapas siguientes terminan cuando vacían sus colas
+        self.fin_captura = True
+
+    def _etapa_inferencia(self):
+        """Ejecutar MediaPipe y clasificar el gesto del frame más reciente"""
+        estadisticas = self.estadisticas["inferencia"]
+        while self.activo:
+            elemento = self.cola_inferencia.get(timeout=0.1)
+            if elemento is None:
+                if self.fin_captura and not len(self.cola_inferencia):
+                    break
+                continue
+            try:
+                frame, tiempo = elemento
+                inicio = time.perf_counter()
+                gesto_confirmado = self.procesador_eventos.gesto_esta_confirmado()
+                span = INSTRUMENTACION.inicio()
+                manos, gesto = self.detector_gestos.detectar(frame)
+                INSTRUMENTACION.fin("2_inferencia.total", span)
+                estadisticas.registrar(time.perf_counter() - inicio)
+
+                # Los gestos no pasan por la cola de render: nunca se descartan
+                if gesto:
+                    self.al_gesto(gesto, tiempo)
+                self.cola_render.put((frame, manos, gesto, gesto_confirmado))
+            except Exception:
+                pass
+        self.fin_inferencia = True
+
+    def _etapa_render(self):
+        """Dibujar el overlay y entregar el frame a la interfaz"""
+        estadisticas = self.estadisticas["render"]
+        while self.activo:
+            elemento = self.cola_render.get(timeout=0.1)
+            if elemento is None:
+                if self.fin_inferencia and not len(self.cola_render):
+                    break
+                continue
+            try:
+                frame, manos, gesto, gesto_confirmado = elemento
+                if not self.anotar:
+                    self.frames_sin_anotar += 1
+                    continue
+
+                inicio = time.perf_counter()
+                span = INSTRUMENTACION.inicio()
+                # El frame ya no se usa en otra etapa: se anota sin copiarlo
+                frame_procesado = self.detector_gestos.dibujar(frame, manos, gesto_confirmado, en_sitio=True)
+                INSTRUMENTACION.fin("3_render.overlay", span)
+                span = INSTRUMENTACION.inicio()
+                self.al_frame(frame_procesado, gesto)
+                INSTRUMENTACION.fin("3_render.entrega", span)
+                estadisticas.registrar(time.perf_counter() - inicio)
+            except Exception:
+                pass
+        self.activo = False
+
+    def obtener_estadisticas(self):
+        """Throughput por etapa y frames descartados en la cola de entrada de cada una"""
+        resumen = {nombre: etapa.resumen() for nombre, etapa in self.estadisticas.items()}
+        resumen["captura"]["descartados"] = 0
+        resumen["inferencia"]["descartados"] = self.cola_inferencia.descartados
+        resumen["render"]["descartados"] = self.cola_render.descartados
+        resumen["render"]["sin_anotar"] = self.frames_sin_anotar
+        return resumen
\ No newline at end of file
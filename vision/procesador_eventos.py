@@ -1,4 +1,5 @@
 import time
+from utils.buffer_circular import BufferCircular
 
 class ProcesadorEventos:
     def __init__(self, max_caracteres=500):
@@ -9,15 +10,18 @@ class ProcesadorEventos:
         self.gesto_confirmado = False
         self.contador_frames_mismo_gesto = 0
         self.frames_para_confirmar = 8  # Frames necesarios para confirmar gesto
+        self.secuencia = BufferCircular(max_caracteres)
         
-    def agregar_letra(self, letra, secuencia_actual):
-        """Procesar gesto y agregar a secuencia si cumple condiciones"""
+    def agregar_letra(self, letra, tiempo_actual=None):
+        """Procesar gesto y devolver la letra si se confirmó y agregó a la secuencia"""
         if not letra:
             self.contador_frames_mismo_gesto = 0
             self.gesto_confirmado = False
-            return secuencia_actual
+            return None
             
-        tiempo_actual = time.time()
+        # Sin tiempo explícito se usa el reloj real (cámara en vivo)
+        if tiempo_actual is None:
+            tiempo_actual = time.time()
         
         # Gestos nuevos reinician contadores
         if letra != self.ultimo_gesto:
@@ -25,7 +29,7 @@ class ProcesadorEventos:
             self.ultimo_tiempo_gesto = tiempo_actual
             self.contador_frames_mismo_gesto = 1
             self.gesto_confirmado = False
-            return secuencia_actual
+            return None
             
         # Mismo gesto - incrementar contador
         else:
@@ -38,16 +42,18 @@ class ProcesadorEventos:
                 self.ultimo_tiempo_gesto = tiempo_actual
                 self.gesto_confirmado = True
                 
-                # Agregar letra y limitar longitud
-                nueva_secuencia = secuencia_actual + letra
-                if len(nueva_secuencia) > self.max_caracteres:
-                    nueva_secuencia = nueva_secuencia[-self.max_caracteres:]
+                # Agregar letra (el buffer circular limita la longitud)
+                self.secuencia.agregar(letra)
                     
-                return nueva_secuencia
+                return letra
         
         # No cumplió condiciones para agregar
         self.gesto_confirmado = False
-        return secuencia_actual
+        return None
+    
+    def limpiar_secuencia(self):
+        """Vaciar la secuencia acumulada"""
+        self.secuencia.vaciar()
     
     def gesto_esta_confirmado(self):
         """Verificar si el gesto actual fue confirmado"""